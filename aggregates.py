@@ -0,0 +1,180 @@
+# aggregates.py
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from data_index import BREAKDOWN_COLUMNS, SERIES_COLUMNS as KEY_COLUMNS
+from data_loader import CODE_LABEL_COLUMNS
+
+# Kode SDMX untuk total dan "tidak berlaku"; breakdown yang hanya berisi kode ini adalah seri total
+TOTAL_CODES = ('_T', '_Z')
+
+Summary = namedtuple('Summary', [
+    'country', 'iso', 'first_year', 'latest_year', 'latest_value',
+    'min', 'max', 'max_year', 'sum', 'count',
+])
+
+
+def _clean(value):
+    # Value float32 -> float Python dengan representasi terpendek (78.6, bukan 78.59999847)
+    return float(str(np.float32(value)))
+
+
+class SummaryCube:
+    """Tabel agregat per (indikator, negara, breakdown): tahun & nilai terakhir,
+    min/max/jumlah/banyak observasi.
+
+    Dibangun sekali saat data dimuat; update() menghitung ulang seri yang tersentuh
+    refresh inkremental (lihat ingest.refresh). Kartu metrik, grafik batang dan peta dijawab dari tabel
+    ini tanpa memindai baris mentah, kecuali rentang tahun yang dipilih memotong
+    seri (lihat summarize()).
+    """
+
+    def __init__(self, df):
+        self.table = _aggregate(df)
+        self._reindex()
+
+    def _reindex(self):
+        self._rows = {
+            key: row for key, row in zip(self.table.index, self.table.itertuples(index=False))
+        }
+        self._breakdowns = {}
+        for key in self._rows:
+            self._breakdowns.setdefault(key[0], {}).setdefault(key[2:], 0)
+            self._breakdowns[key[0]][key[2:]] += 1
+
+    def update(self, series_rows):
+        """Menghitung ulang ringkasan seri yang muncul di `series_rows`.
+
+        `series_rows` harus berisi *semua* baris seri yang tersentuh (termasuk revisi
+        nilai lama); seri lain tidak disentuh.
+        """
+        if series_rows.empty:
+            return
+        new = _aggregate(series_rows)
+        self.table = pd.concat([self.table.drop(new.index, errors='ignore'), new]).sort_index()
+        self._reindex()
+
+    def breakdowns(self, indicator):
+        """Kombinasi breakdown yang ada untuk indikator ini."""
+        return sorted(self._breakdowns.get(indicator, {}))
+
+    def default_breakdown(self, indicator):
+        """Seri total (_T/_Z di semua dimensi) jika ada, selain itu breakdown dengan seri terbanyak."""
+        options = self._breakdowns.get(indicator, {})
+        if not options:
+            return (TOTAL_CODES[0],) * len(BREAKDOWN_COLUMNS)
+        totals = [b for b in options if is_total(b)]
+        return max(sorted(totals or options), key=lambda b: options[b])
+
+    def resolve_breakdown(self, indicator, value):
+        """Breakdown dari nilai dropdown; kembali ke bawaan jika tidak ada untuk indikator ini."""
+        breakdown = parse_breakdown(value)
+        if breakdown in self._breakdowns.get(indicator, {}):
+            return breakdown
+        return self.default_breakdown(indicator)
+
+    def breakdown_options(self, indicator, labels=None):
+        """Opsi dropdown breakdown untuk indikator ini: total dulu, lalu urut label."""
+        options = [{'label': breakdown_label(b, labels), 'value': format_breakdown(b)}
+                   for b in self.breakdowns(indicator)]
+        return sorted(options, key=lambda o: (o['label'] != 'Total', o['label']))
+
+    def breakdown_choice(self, indicator, current=None, labels=None):
+        """(opsi, nilai) dropdown breakdown; pilihan `current` dipertahankan jika ada untuk indikator ini."""
+        breakdown = self.resolve_breakdown(indicator, current)
+        return self.breakdown_options(indicator, labels), format_breakdown(breakdown)
+
+    def series(self, indicator, country, breakdown):
+        row = self._rows.get((indicator, country) + tuple(breakdown))
+        return None if row is None else Summary(country, *row)
+
+    def summarize(self, index, indicator, countries, year_range, breakdown):
+        """Ringkasan per negara untuk pilihan ini, dalam urutan `countries`.
+
+        Jika rentang tahun mencakup seluruh seri, ringkasan diambil langsung dari
+        tabel. Jika memotong seri, ringkasan dihitung dari blok seri itu saja
+        (lewat SliceIndex), tidak pernah dari seluruh tabel.
+        """
+        breakdown = tuple(breakdown)
+        result = []
+        for country in countries or []:
+            s = self.series(indicator, country, breakdown)
+            if s is None:
+                continue
+            if year_range is None or (year_range[0] <= s.first_year and s.latest_year <= year_range[1]):
+                result.append(s)
+                continue
+            rows = index.slice(indicator, [country], year_range, breakdown)
+            if not rows.empty:
+                result.append(Summary(country, *_summarize_rows(rows)))
+        return result
+
+
+def is_total(breakdown):
+    return all(code in TOTAL_CODES for code in breakdown)
+
+
+def format_breakdown(breakdown):
+    """Breakdown -> string bergaya kunci seri SDMX ('F._T._T...'), dipakai sebagai nilai dropdown."""
+    return '.'.join(breakdown)
+
+
+def parse_breakdown(value):
+    if not value:
+        return None
+    breakdown = tuple(value.split('.'))
+    return breakdown if len(breakdown) == len(BREAKDOWN_COLUMNS) else None
+
+
+def breakdown_label(breakdown, labels=None):
+    """Label singkat, hanya dimensi yang bukan total, mis. 'Sex: Female, Age: 15-24 years'."""
+    labels = labels or {}
+    parts = []
+    for col, code in zip(BREAKDOWN_COLUMNS, breakdown):
+        if code in TOTAL_CODES:
+            continue
+        label = labels.get(col, {}).get(code, code)
+        # Label composite breakdown sudah memuat nama dimensinya ('Internet speed: ...')
+        parts.append(label if col == 'COMPOSITE_BREAKDOWN' else f"{CODE_LABEL_COLUMNS.get(col, col)}: {label}")
+    return ', '.join(parts) or 'Total'
+
+
+def _summarize_rows(rows):
+    values = rows['Value'].to_numpy()
+    years = rows['Year'].to_numpy()
+    imax = int(np.argmax(values))
+    iso = rows['iso_alpha'].iloc[0]
+    return (
+        iso if isinstance(iso, str) else None,
+        int(years[0]), int(years[-1]), _clean(values[-1]),
+        _clean(values.min()), _clean(values[imax]), int(years[imax]),
+        float(values.astype(np.float64).sum()), len(values),
+    )
+
+
+def _aggregate(df):
+    columns = ['iso', 'first_year', 'latest_year', 'latest_value', 'min', 'max', 'max_year', 'sum', 'count']
+    if df.empty or not set(KEY_COLUMNS).issubset(df.columns):
+        return pd.DataFrame(columns=columns, index=pd.MultiIndex.from_tuples([], names=KEY_COLUMNS))
+    # Baris dalam satu seri sudah terurut menurut tahun (urutan penyimpanan data_loader)
+    groups = df.groupby(KEY_COLUMNS, observed=True, sort=True)
+    values = df['Value'].astype(np.float64)
+    table = pd.DataFrame({
+        'iso': groups['iso_alpha'].first().astype(object),
+        'first_year': groups['Year'].first().astype(int),
+        'latest_year': groups['Year'].last().astype(int),
+        'latest_value': groups['Value'].last().map(_clean),
+        'min': groups['Value'].min().map(_clean),
+        'max': groups['Value'].max().map(_clean),
+        'max_year': df['Year'].loc[groups['Value'].idxmax()].to_numpy(),
+        'sum': values.groupby([df[c] for c in KEY_COLUMNS], observed=True, sort=True).sum(),
+        'count': groups.size(),
+    })
+    table.index = table.index.set_names(KEY_COLUMNS)
+    # Kode kategori -> string biasa agar kunci tuple cocok dengan input callback
+    table.index = pd.MultiIndex.from_tuples([tuple(map(str, k)) for k in table.index], names=KEY_COLUMNS)
+    table['iso'] = table['iso'].where(table['iso'].notna(), None)
+    return table[columns]
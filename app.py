@@ -1,10 +1,22 @@
 import dash
 import dash_bootstrap_components as dbc
 from dash import html, dcc, Input, Output
+import hot_reload
+import http_delivery
+import instrumentation
+import narrative_figures
 
 # Inisialisasi aplikasi
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.LUX], use_pages=True)
 server = app.server
+# POST /admin/reload: muat ulang data tanpa restart (lihat hot_reload.py)
+hot_reload.register_endpoint(server)
+# GET /narrative/figures/<kunci>.json: figure halaman naratif yang bisa disimpan browser
+narrative_figures.register_endpoint(server)
+# Kompresi gzip/brotli dan ETag/Cache-Control (lihat http_delivery.py)
+http_delivery.init_app(app)
+# Header Server-Timing per callback dan metrik Prometheus di /metrics (lihat instrumentation.py)
+instrumentation.init_app(app)
 
 # Navbar untuk navigasi
 navbar = dbc.NavbarSimple(
@@ -29,4 +41,5 @@ app.layout = html.Div([
 
 # Jalankan server
 if __name__ == '__main__':
+    hot_reload.start_watcher()
     app.run(debug=True)
\ No newline at end of file
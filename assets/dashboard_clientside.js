@@ -0,0 +1,220 @@
+/*
+ * Callback clientside untuk mode filter di browser (lihat clientside.py).
+ * Data datang dari dcc.Store dalam bentuk kolom: array `year`/`value` dan daftar
+ * blok [indikator, negara, breakdown, start, stop] yang terurut menurut tahun.
+ * Figure yang dibangun di sini meniru modul figures.py di server.
+ */
+(function () {
+    var indexCache = new WeakMap();
+
+    // Peta "indikator|negara|breakdown" -> [start, stop, negara], dibangun sekali per payload.
+    // index.breakdowns[indikator] berisi breakdown yang ada untuk indikator itu.
+    function blockIndex(data) {
+        var index = indexCache.get(data);
+        if (!index) {
+            index = {series: {}, breakdowns: {}};
+            data.blocks.forEach(function (b) {
+                var indicator = data.indicators[b[0]], breakdown = data.breakdowns[b[2]];
+                index.series[indicator + '|' + data.countries[b[1]] + '|' + breakdown] = [b[3], b[4], b[1]];
+                (index.breakdowns[indicator] = index.breakdowns[indicator] || {})[breakdown] = true;
+            });
+            indexCache.set(data, index);
+        }
+        return index;
+    }
+
+    // Sama dengan SummaryCube.resolve_breakdown: kembali ke bawaan jika tidak ada untuk indikator ini
+    function resolveBreakdown(data, indicator, breakdown) {
+        var available = blockIndex(data).breakdowns[indicator] || {};
+        return available[breakdown] ? breakdown : data.defaults[indicator];
+    }
+
+    // Pencarian biner: posisi pertama di [lo, hi) dengan year > target (atau >= jika !right)
+    function bisect(years, target, lo, hi, right) {
+        while (lo < hi) {
+            var mid = (lo + hi) >> 1;
+            if (years[mid] < target || (right && years[mid] === target)) { lo = mid + 1; } else { hi = mid; }
+        }
+        return lo;
+    }
+
+    // Seri per negara (urutan sama dengan SliceIndex.slice di server)
+    function selectSeries(data, indicator, countries, yearRange, breakdown) {
+        var index = blockIndex(data);
+        var series = [];
+        breakdown = resolveBreakdown(data, indicator, breakdown);
+        (countries || []).forEach(function (country) {
+            var block = index.series[indicator + '|' + country + '|' + breakdown];
+            if (!block) { return; }
+            var start = block[0], stop = block[1];
+            if (yearRange) {
+                var lo = bisect(data.year, yearRange[0], start, stop, false);
+                stop = bisect(data.year, yearRange[1], start, stop, true);
+                start = lo;
+            }
+            if (stop > start) {
+                series.push({
+                    country: country,
+                    iso: data.iso[block[2]],
+                    years: data.year.slice(start, stop),
+                    values: data.value.slice(start, stop)
+                });
+            }
+        });
+        return series;
+    }
+
+    function countryColors(data, series) {
+        var colors = {};
+        series.map(function (s) { return s.country; }).sort().forEach(function (c, i) {
+            colors[c] = data.colorway[i % data.colorway.length];
+        });
+        return colors;
+    }
+
+    function annotations(message) {
+        if (!message) { return []; }
+        return [{text: message, xref: 'paper', yref: 'paper', showarrow: false, font: {size: 16}}];
+    }
+
+    function figure(data, name, traces, title, message) {
+        var layout = Object.assign({template: data.template}, data.layouts[name], {annotations: annotations(message)});
+        if (title !== null) { layout.title = {text: title}; layout.uirevision = title; }
+        return {data: traces, layout: layout};
+    }
+
+    // Seperti figures.line_traces: di atas webgl_points titik memakai scattergl tanpa marker
+    function lineTraces(data, series, colors) {
+        var points = series.reduce(function (n, s) { return n + s.years.length; }, 0);
+        var webgl = points > data.webgl_points;
+        return series.map(function (s) {
+            return {
+                type: webgl ? 'scattergl' : 'scatter', mode: webgl ? 'lines' : 'lines+markers',
+                name: s.country, legendgroup: s.country,
+                x: s.years, y: s.values, line: {color: colors[s.country]},
+                hovertemplate: 'Country=' + s.country + '<br>Year=%{x}<br>Value=%{y}<extra></extra>'
+            };
+        });
+    }
+
+    function barTraces(series, colors, orientation) {
+        return series.map(function (s) {
+            var value = s.values[s.values.length - 1];
+            var bar = {type: 'bar', name: s.country, legendgroup: s.country, orientation: orientation,
+                       marker: {color: colors[s.country]}};
+            if (orientation === 'h') {
+                bar.x = [value]; bar.y = [s.country];
+                bar.hovertemplate = 'Country=%{y}<br>Value=%{x}<extra></extra>';
+            } else {
+                bar.x = [s.country]; bar.y = [value];
+                bar.hovertemplate = 'Country=%{x}<br>Value=%{y}<extra></extra>';
+            }
+            return bar;
+        });
+    }
+
+    function latestYear(series) {
+        return Math.max.apply(null, series.map(function (s) { return s.years[s.years.length - 1]; }));
+    }
+
+    function formatNumber(v) {
+        return v.toLocaleString('en-US', {minimumFractionDigits: 2, maximumFractionDigits: 2});
+    }
+
+    function card(children) {
+        return {
+            namespace: 'dash_bootstrap_components', type: 'Card',
+            props: {className: 'mb-3', color: 'light', children: {
+                namespace: 'dash_bootstrap_components', type: 'CardBody', props: {children: children}
+            }}
+        };
+    }
+
+    function html(type, text, className) {
+        return {namespace: 'dash_html_components', type: type, props: {children: text, className: className}};
+    }
+
+    function metricCards(series) {
+        var total = 0, count = 0, best = null;
+        series.forEach(function (s) {
+            s.values.forEach(function (v, i) {
+                total += v; count += 1;
+                if (best === null || v > best.value) { best = {value: v, country: s.country, year: s.years[i]}; }
+            });
+        });
+        return [
+            card([html('H4', 'Average Value', 'card-title'), html('P', formatNumber(total / count), 'card-text fs-3')]),
+            card([html('H4', 'Highest Value', 'card-title'), html('P', formatNumber(best.value), 'card-text fs-3'),
+                  html('Small', best.country + ' (' + best.year + ')', 'text-muted')])
+        ];
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        blue_pacific: {
+            // pages/narrative.py: figure diambil dari URL berversi (narrative_figures.register_endpoint)
+            // sehingga browser menyimpannya dan kunjungan berikutnya tidak mengunduh ulang
+            narrative_figures: function (url) {
+                if (!url) {
+                    var nu = window.dash_clientside.no_update;
+                    return [nu, nu, nu];
+                }
+                return fetch(url).then(function (response) {
+                    if (!response.ok) { throw new Error('narrative figures: HTTP ' + response.status); }
+                    return response.json();
+                }).then(function (figures) {
+                    return [figures.map, figures.coverage, figures.price];
+                });
+            },
+
+            // pages/dashboard.py
+            dashboard_charts: function (indicator, countries, yearRange, breakdown, data) {
+                if (!data) { return [window.dash_clientside.no_update, window.dash_clientside.no_update]; }
+                var series = indicator && yearRange ? selectSeries(data, indicator, countries, yearRange, breakdown) : [];
+                var message = null;
+                if (!indicator || !yearRange || !countries || !countries.length) {
+                    message = 'Please select all filters';
+                } else if (!series.length) {
+                    message = 'No data available for this selection';
+                }
+                var colors = countryColors(data, series);
+                var barTitle = series.length
+                    ? 'Perbandingan di Tahun Terakhir (' + latestYear(series) + '): ' + indicator
+                    : 'Perbandingan di Tahun Terakhir: ' + indicator;
+                return [
+                    figure(data, 'line', lineTraces(data, series, colors), 'Tren Tahunan: ' + indicator, message),
+                    figure(data, 'bar', barTraces(series, colors, 'v'), barTitle, message)
+                ];
+            },
+
+            // layout.create_layout + callbacks.register_callbacks
+            visuals: function (indicator, countries, yearRange, breakdown, data) {
+                var nu = window.dash_clientside.no_update;
+                if (!data) { return [nu, nu, nu, nu]; }
+                var series = selectSeries(data, indicator, countries, yearRange, breakdown);
+                var message = null;
+                if (!countries || !countries.length) {
+                    message = 'Please select a country';
+                } else if (!series.length) {
+                    message = 'No data for selection';
+                }
+                var colors = countryColors(data, series);
+                var barTitle = series.length
+                    ? '<b>Comparison in Latest Year (' + latestYear(series) + ')</b>'
+                    : '<b>Comparison in Latest Year</b>';
+                var mapTrace = Object.assign({}, data.traces.map[0], {
+                    geojson: data.geojson,
+                    locations: series.map(function (s) { return s.iso; }),
+                    z: series.map(function (s) { return s.values[s.values.length - 1]; }),
+                    hovertext: series.map(function (s) { return s.country; }),
+                    customdata: series.map(function (s) { return [s.years[s.years.length - 1]]; })
+                });
+                return [
+                    figure(data, 'time', lineTraces(data, series, colors), '<b>Trend: ' + indicator + '</b>', message),
+                    figure(data, 'bar', barTraces(series, colors, 'h'), barTitle, message),
+                    figure(data, 'map', [mapTrace], null, message),
+                    series.length ? metricCards(series) : []
+                ];
+            }
+        }
+    });
+})();
@@ -0,0 +1,325 @@
+# bench.py
+#
+# Benchmark jalur panas dasbor dan halaman naratif, untuk mendeteksi regresi saat
+# lapisan data diubah. Diukur per ukuran dataset:
+#   - impor dingin pages.narrative dan pages.dashboard (interpreter baru, dash sudah diimpor),
+#   - load_data(): waktu dan puncak memori, dari CSV mentah (DATA_CACHE=0) dan dari cache biner,
+#   - latensi update_visuals / update_dashboard_charts atas matriks indikator/negara/tahun
+#     yang diambil acak dengan seed tetap: muatan penuh, Patch, dan dari figure_cache,
+#   - ukuran payload JSON per callback, dan waktu layout() halaman naratif.
+#
+# Dataset sintetis (--scales 10,100,1000) dibuat dari CSV bawaan: salinan ke-i memakai
+# kode indikator `<kode>_X<i>` dan nilai yang digeser sedikit, lalu ditaruh di SDMX_DIR
+# tersendiri sehingga dimuat lewat jalur multi-ekspor biasa (data_loader.source_paths).
+# Setiap pengukuran berjalan di subprocess agar impor dan memori benar-benar dingin.
+#
+# Hasil ditambahkan ke BENCH_HISTORY (JSON) dan dibandingkan dengan run sebelumnya
+# untuk skala yang sama; perubahan di atas --tolerance ditandai sebagai regresi.
+#
+#   python bench.py                         # skala 1, 10, 100
+#   python bench.py --scales 1,1000 --samples 50
+#   python bench.py --check                 # exit code 1 jika ada regresi
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+import data_loader
+
+BENCH_DIR = os.environ.get("BENCH_DIR", os.path.join(data_loader.BASE_DIR, ".cache", "bench"))
+BENCH_HISTORY = os.environ.get("BENCH_HISTORY", os.path.join(BENCH_DIR, "history.json"))
+
+VISUALS_OUTPUT = '..time-series-plot.figure...comparison-plot.figure...map-plot.figure...metrics-display.children..'
+
+
+# --- Dataset sintetis ---
+
+def synthetic_dir(scale):
+    """SDMX_DIR untuk skala ini; skala 1 memakai direktori kosong (hanya CSV bawaan)."""
+    path = os.path.join(BENCH_DIR, f"x{scale}")
+    os.makedirs(path, exist_ok=True)
+    if scale <= 1:
+        return path
+    target = os.path.join(path, "synthetic.csv")
+    if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(data_loader.CSV_PATH):
+        return path
+
+    import numpy as np
+    import pandas as pd
+
+    base = pd.read_csv(data_loader.CSV_PATH, usecols=lambda c: c in data_loader.RAW_COLUMNS, dtype=str)
+    values = pd.to_numeric(base['OBS_VALUE'], errors='coerce').to_numpy()
+    rng = np.random.default_rng(scale)
+    tmp = f"{target}.tmp-{os.getpid()}"
+    for i in range(1, scale):
+        copy = base.copy()
+        copy['INDICATOR'] = copy['INDICATOR'] + f"_X{i}"
+        if 'Indicator' in copy.columns:
+            copy['Indicator'] = copy['Indicator'] + f" [x{i}]"
+        copy['OBS_VALUE'] = values * rng.uniform(0.9, 1.1, len(values))
+        copy.to_csv(tmp, mode='w' if i == 1 else 'a', header=i == 1, index=False)
+    os.replace(tmp, target)
+    return path
+
+
+# --- Pengukuran (dijalankan di subprocess) ---
+
+def _peak_rss_mb():
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / 1024 ** 2 if platform.system() == "Darwin" else maxrss / 1024
+
+
+def measure_import(module):
+    import dash
+
+    # Biaya impor dash dan pembuatan app tidak dihitung ke halaman; register_page butuh app
+    dash.Dash(__name__, use_pages=True, pages_folder="")
+    start = time.perf_counter()
+    __import__(module)
+    return {'seconds': time.perf_counter() - start, 'peak_rss_mb': _peak_rss_mb()}
+
+
+def measure_load():
+    import tracemalloc
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    df, _ = data_loader.load_data()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': elapsed, 'peak_mb': peak / 1024 ** 2, 'peak_rss_mb': _peak_rss_mb(), 'rows': len(df)}
+
+
+def sample_inputs(store, samples, seed):
+    """Matriks input callback (indikator, negara, rentang tahun) yang deterministik untuk seed."""
+    rng = random.Random(seed)
+    indicators = sorted({key[0] for key, _ in store.index.blocks()})
+    lo, hi = store.year_bounds
+    matrix = []
+    for _ in range(samples):
+        indicator = rng.choice(indicators)
+        countries = store.index.countries(indicator)
+        chosen = rng.sample(countries, rng.randint(1, min(6, len(countries))))
+        y0 = rng.randint(lo, hi)
+        matrix.append((indicator, chosen, [y0, rng.randint(y0, hi)]))
+    return matrix
+
+
+def _call(func, trigger, args):
+    """Memanggil fungsi callback seperti Dash: konteks trigger, lalu serialisasi JSON."""
+    import instrumentation
+    from dash import Patch
+    from dash._callback_context import context_value
+    from dash._utils import AttributeDict, to_json
+
+    context_value.set(AttributeDict(triggered_inputs=[{'prop_id': f'{trigger}.value', 'value': None}]))
+    with instrumentation.collect() as timings:
+        start = time.perf_counter()
+        out = func(*args)
+        built = time.perf_counter()
+        body = to_json([v.to_plotly_json() if isinstance(v, Patch) else v for v in out])
+        end = time.perf_counter()
+    return {'ms': (built - start) * 1000, 'serialize_ms': (end - built) * 1000, 'bytes': len(body),
+            'stages': {name: seconds * 1000 for name, seconds in timings.items()}}
+
+
+def _summary(runs):
+    ms = sorted(r['ms'] for r in runs)
+    stages = {}
+    for r in runs:
+        for name, value in r['stages'].items():
+            stages.setdefault(name, []).append(value)
+    return {
+        'p50_ms': statistics.median(ms),
+        'p95_ms': ms[min(len(ms) - 1, int(round(0.95 * (len(ms) - 1))))],
+        'serialize_p50_ms': statistics.median(r['serialize_ms'] for r in runs),
+        'bytes_p50': statistics.median(r['bytes'] for r in runs),
+        'bytes_max': max(r['bytes'] for r in runs),
+        **{f'{name}_p50_ms': statistics.median(values) for name, values in stages.items()},
+    }
+
+
+def measure_callbacks(samples, seed):
+    import dash
+    from dash import _callback
+
+    app = dash.Dash(__name__, use_pages=True, pages_folder="")
+    import callbacks
+    import data_store
+    import figure_cache
+    import pages.dashboard
+    import pages.narrative
+
+    callbacks.register_callbacks(app)
+    store = data_store.current()
+    cache = figure_cache.get_cache()
+    visuals = _callback.GLOBAL_CALLBACK_MAP[VISUALS_OUTPUT]['callback'].__wrapped__
+    dashboard = pages.dashboard.update_dashboard_charts
+    matrix = sample_inputs(store, samples, seed)
+
+    results = {}
+    for name, func, selection in [('update_visuals', visuals, 'country-selector'),
+                                  ('update_dashboard_charts', dashboard, 'country-dropdown')]:
+        trigger = 'indicator-selector' if name == 'update_visuals' else 'indicator-dropdown'
+        full, patch, cached = [], [], []
+        for indicator, countries, year_range in matrix:
+            args = (indicator, countries, year_range, None)
+            cache.invalidate(store.version)
+            full.append(_call(func, trigger, args))
+            cached.append(_call(func, trigger, args))
+            cache.invalidate(store.version)
+            patch.append(_call(func, selection, args))
+        results[name] = {'full': _summary(full), 'patch': _summary(patch), 'cached': _summary(cached)}
+
+    start = time.perf_counter()
+    pages.narrative.layout()
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    pages.narrative.layout()
+    results['narrative_layout'] = {'first_ms': first * 1000, 'warm_ms': (time.perf_counter() - start) * 1000}
+    results['rows'] = len(store.df)
+    return results
+
+
+# --- Orkestrasi ---
+
+def _child(kind, scale, args=(), extra_env=None):
+    env = {**os.environ, 'SDMX_DIR': synthetic_dir(scale), 'DASHBOARD_MODE': 'server',
+           'RELOAD_INTERVAL': '0', **(extra_env or {})}
+    cmd = [sys.executable, os.path.abspath(__file__), '--child', kind, *args]
+    proc = subprocess.run(cmd, env=env, cwd=data_loader.BASE_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{kind} (x{scale}) gagal:\n{proc.stderr[-2000:]}")
+    # Baris terakhir stdout adalah hasil JSON; sisanya log modul (data_store, dll.)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run_scale(scale, samples, seed):
+    print(f"[bench] x{scale}: dataset ...", flush=True)
+    synthetic_dir(scale)
+    result = {'load_csv': _child('load', scale, extra_env={'DATA_CACHE': '0'})}
+    # Run pertama dengan cache membangun bundle biner; yang diukur run berikutnya
+    _child('load', scale)
+    result['load_cached'] = _child('load', scale)
+    print(f"[bench] x{scale}: impor ...", flush=True)
+    result['import'] = {module: _child('import', scale, [module]) for module in ('pages.narrative', 'pages.dashboard')}
+    print(f"[bench] x{scale}: callback ({samples} sampel) ...", flush=True)
+    result['callbacks'] = _child('callbacks', scale, ['--samples', str(samples), '--seed', str(seed)])
+    result['rows'] = result['callbacks'].pop('rows')
+    return result
+
+
+def flatten(result, prefix=''):
+    flat = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(previous, current, tolerance):
+    """Daftar (metrik, lama, baru, rasio) yang memburuk lebih dari `tolerance` (semua metrik: makin kecil makin baik)."""
+    old, new = flatten(previous), flatten(current)
+    worse = []
+    for key, value in new.items():
+        if key == 'rows' or key not in old or old[key] <= 0:
+            continue
+        # Abaikan derau di bawah 1 ms / 1 KB pada metrik yang sangat kecil
+        if abs(value - old[key]) < (1024 if 'bytes' in key else 1.0 if key.endswith('ms') else 0.001):
+            continue
+        ratio = value / old[key]
+        if ratio > 1 + tolerance:
+            worse.append((key, old[key], value, ratio))
+    return worse
+
+
+def load_history(path=BENCH_HISTORY):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def save_history(history, path=BENCH_HISTORY):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp, path)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=data_loader.BASE_DIR,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dasbor dan halaman naratif Blue Pacific.")
+    parser.add_argument('--scales', default='1,10,100', help="kelipatan dataset bawaan, dipisah koma")
+    parser.add_argument('--samples', type=int, default=20, help="jumlah kombinasi input callback per skala")
+    parser.add_argument('--seed', type=int, default=2050)
+    parser.add_argument('--history', default=BENCH_HISTORY)
+    parser.add_argument('--tolerance', type=float, default=0.2, help="rasio perlambatan yang ditandai regresi")
+    parser.add_argument('--no-save', action='store_true', help="jangan tambahkan hasil ke history")
+    parser.add_argument('--check', action='store_true', help="exit code 1 jika ada regresi")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('module', nargs='?', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        if args.child == 'import':
+            result = measure_import(args.module)
+        elif args.child == 'load':
+            result = measure_load()
+        else:
+            result = measure_callbacks(args.samples, args.seed)
+        print(json.dumps(result))
+        return 0
+
+    history = load_history(args.history)
+    run = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'revision': git_revision(),
+           'python': platform.python_version(), 'samples': args.samples, 'seed': args.seed, 'scales': {}}
+    regressions = 0
+    for scale in [int(s) for s in args.scales.split(',') if s.strip()]:
+        result = run_scale(scale, args.samples, args.seed)
+        run['scales'][str(scale)] = result
+        cb = result['callbacks']
+        print(f"[bench] x{scale}: {result['rows']} baris | load csv {result['load_csv']['seconds']:.2f}s "
+              f"(puncak {result['load_csv']['peak_mb']:.1f} MB), cache {result['load_cached']['seconds']:.3f}s | "
+              f"impor naratif {result['import']['pages.narrative']['seconds']:.3f}s, "
+              f"dasbor {result['import']['pages.dashboard']['seconds']:.3f}s")
+        for name in ('update_visuals', 'update_dashboard_charts'):
+            s = cb[name]
+            print(f"[bench]   {name}: penuh p50 {s['full']['p50_ms']:.1f} ms p95 {s['full']['p95_ms']:.1f} ms "
+                  f"({s['full']['bytes_p50'] / 1024:.0f} KB), patch p50 {s['patch']['p50_ms']:.1f} ms "
+                  f"({s['patch']['bytes_p50'] / 1024:.0f} KB), cache p50 {s['cached']['p50_ms']:.2f} ms")
+
+        previous = next((r['scales'][str(scale)] for r in reversed(history) if str(scale) in r.get('scales', {})), None)
+        if previous is not None:
+            for key, old, new, ratio in compare(previous, result, args.tolerance):
+                regressions += 1
+                print(f"[bench]   REGRESI {key}: {old:.4g} -> {new:.4g} (x{ratio:.2f})")
+
+    if not args.no_save:
+        history.append(run)
+        save_history(history, args.history)
+        print(f"[bench] hasil ditambahkan ke {args.history} ({len(history)} run)")
+    return 1 if args.check and regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,85 +1,165 @@
 # callbacks.py
 
-from dash import Input, Output, callback
-import plotly.express as px
-import plotly.graph_objects as go
+from dash import Input, Output, State, Patch, ClientsideFunction, callback, clientside_callback, ctx, html
 import dash_bootstrap_components as dbc
-import pandas as pd
+import clientside
+import data_store
+import figure_cache
+import figures
+import instrumentation
 
-# Tandatangan fungsi diubah untuk menerima geojson_data
-def register_callbacks(app, data, geojson_data):
+# Input yang hanya mengubah pilihan data; perubahan ini dijawab dengan Patch
+SELECTION_INPUTS = ('country-selector', 'year-slider', 'breakdown-selector')
+
+VISUAL_OUTPUTS = [
+    Output('time-series-plot', 'figure'),
+    Output('comparison-plot', 'figure'),
+    Output('map-plot', 'figure'),
+    Output('metrics-display', 'children'),
+]
+FILTER_INPUTS = [
+    Input('indicator-selector', 'value'),
+    Input('country-selector', 'value'),
+    Input('year-slider', 'value'),
+    Input('breakdown-selector', 'value'),
+]
+
+
+def patch_only(selection_inputs):
+    """True jika yang memicu callback hanya input pilihan (bukan indikator / muatan awal)."""
+    triggered = {prop.split('.')[0] for prop in ctx.triggered_prop_ids}
+    return bool(triggered) and triggered <= set(selection_inputs)
+
+
+def _shells(geojson_data, selected_indicator=''):
+    # --- Grafik Tren dan Perbandingan ---
+    common = dict(transition={'duration': 500}, margin={'t': 50})
+    return {
+        'time': figures.line_shell(f'<b>Trend: {selected_indicator}</b>', **common),
+        'bar': figures.bar_shell('h', showlegend=False, **common),
+        # --- Peta geografis: GeoJSON Pasifik, dicocokkan lewat properties.ISO_A3 ---
+        'map': figures.choropleth_shell(
+            geojson_data, colorscale='Viridis', colorbar_title='Value',
+            title={'text': '<b>Geographical Distribution</b>'},
+            margin={"r":0, "t":50, "l":0, "b":0}, transition={'duration': 500},
+        ),
+    }
+
+
+# Mode yang dipilih register_callbacks(); payload 'visuals-data' selalu mengikutinya
+_clientside = None
+
+
+def client_data(store=None):
+    """Payload dcc.Store untuk layout.create_layout(data, client_data=...), atau None
+    jika callback server yang didaftarkan."""
+    store = store or data_store.current()
+    if not (_clientside if _clientside is not None else clientside.startup_enabled()):
+        return None
+    clientside.warn_outgrown(store)
+    return figure_cache.get_cache().get_or_build(
+        f"{store.version}|visuals-data",
+        lambda: clientside.payload(store, _shells(store.geojson_data), include_geojson=True))
+
+
+# Data diambil dari store bersama yang aktif saat request (mengikuti data_store.reload),
+# kecuali store lain diberikan secara eksplisit
+def register_callbacks(app, store=None):
+    global _clientside
+    get_store = (lambda: store) if store is not None else data_store.current
+
+    # Breakdown awal sudah diisi create_layout(); tanpa prevent_initial_call, renderer
+    # membuang panggilan awal update_visuals dan hanya mengirim panggilan yang dipicu
+    # breakdown-selector, sehingga render pertama menjadi Patch pada grafik kosong
     @callback(
-        Output('time-series-plot', 'figure'),
-        Output('comparison-plot', 'figure'),
-        Output('map-plot', 'figure'),
-        Output('metrics-display', 'children'),
+        Output('breakdown-selector', 'options'),
+        Output('breakdown-selector', 'value'),
         Input('indicator-selector', 'value'),
-        Input('country-selector', 'value'),
-        Input('year-slider', 'value')
+        State('breakdown-selector', 'value'),
+        prevent_initial_call=True,
     )
-    def update_visuals(selected_indicator, selected_countries, year_range):
-        from dash import html
+    def update_breakdowns(selected_indicator, current):
+        # Pilihan breakdown sebelumnya dipertahankan jika ada juga untuk indikator baru
+        store = get_store()
+        return store.cube.breakdown_choice(selected_indicator, current, store.labels)
 
-        no_data_fig = go.Figure()
-        no_data_fig.update_layout(
-            xaxis={'visible': False}, yaxis={'visible': False},
-            annotations=[{'text': 'No data for selection', 'xref': 'paper', 'yref': 'paper', 'showarrow': False, 'font': {'size': 16}}]
+    _clientside = clientside.enabled(store) if store is not None else clientside.startup_enabled()
+    if _clientside:
+        # Filter dan figure dibangun di browser dari dcc.Store 'visuals-data'
+        clientside_callback(
+            ClientsideFunction(clientside.NAMESPACE, 'visuals'),
+            *VISUAL_OUTPUTS, *FILTER_INPUTS, Input('visuals-data', 'data')
         )
+        return
 
-        if not selected_countries:
-            no_data_fig.update_layout(annotations=[{'text': 'Please select a country'}])
-            return no_data_fig, no_data_fig, no_data_fig, []
-
-        filtered_df = data[
-            (data['Indicator'] == selected_indicator) &
-            (data['Country'].isin(selected_countries)) &
-            (data['Year'].between(year_range[0], year_range[1]))
-        ].copy()
-
-        if filtered_df.empty:
-            return no_data_fig, no_data_fig, no_data_fig, []
-
-        # --- Grafik Tren dan Perbandingan (Tetap Sama) ---
-        fig_time = px.line(
-            filtered_df.sort_values('Year'), x='Year', y='Value', color='Country', markers=True,
-            title=f'<b>Trend: {selected_indicator}</b>'
-        )
-        fig_time.update_layout(transition_duration=500, legend_title_text='Country', margin=dict(t=50))
+    @callback(*VISUAL_OUTPUTS, *FILTER_INPUTS)
+    def update_visuals(selected_indicator, selected_countries, year_range, selected_breakdown):
+        # Satu store untuk seluruh request, walaupun reload terjadi di tengah jalan
+        store = get_store()
+        # Kombinasi input yang sama (setelah dinormalisasi) dilayani dari cache figure
+        cache = figure_cache.get_cache()
+        breakdown = store.cube.resolve_breakdown(selected_indicator, selected_breakdown)
+        key = figure_cache.make_key('visuals', store, selected_indicator, selected_countries, year_range, breakdown)
+        sel = cache.get_or_build(key, lambda: build_selection(store, selected_indicator, selected_countries, year_range, breakdown))
+        metrics = _metric_cards(sel['metrics'])
 
-        latest_year_df = filtered_df.loc[filtered_df.groupby('Country')['Year'].idxmax()]
-        fig_bar = px.bar(
-            latest_year_df.sort_values('Value', ascending=True), y='Country', x='Value', color='Country',
-            title=f'<b>Comparison in Latest Year ({latest_year_df["Year"].max()})</b>', orientation='h'
-        )
-        fig_bar.update_layout(transition_duration=500, showlegend=False, margin=dict(t=50))
-        fig_bar.update_yaxes(title_text="")
-
-        # --- PEMBARUAN PENTING PADA PETA GEOGRAFIS ---
-        fig_map = px.choropleth(
-            latest_year_df,
-            geojson=geojson_data,                       # 1. Gunakan file GeoJSON Anda
-            locations='iso_alpha',                      # 2. Kolom di dataframe Anda untuk dicocokkan
-            featureidkey="properties.ISO_A3",           # 3. Path ke ID unik di file GeoJSON (biasanya kode ISO 3 huruf)
-            color='Value',
-            color_continuous_scale="Viridis",
-            hover_name='Country',
-            hover_data={'Value': ':.2f', 'Year': True}
-        )
-        # 4. Sesuaikan tampilan peta agar fokus ke lokasi yang relevan
-        fig_map.update_geos(fitbounds="locations", visible=False)
-        fig_map.update_layout(
-            title_text='<b>Geographical Distribution</b>',
-            margin={"r":0, "t":50, "l":0, "b":0},
-            transition_duration=500,
-            coloraxis_colorbar_title_text='Value'
+        if patch_only(SELECTION_INPUTS):
+            # Hanya tahun/negara/breakdown yang berubah: layout, colorscale dan geometri peta
+            # sudah ada di browser, jadi yang dikirim cukup trace dan judul.
+            fig_time, fig_bar, fig_map = Patch(), Patch(), Patch()
+            fig_time['data'] = sel['time']
+            fig_time['layout']['annotations'] = figures.annotations(sel['message'])
+            fig_bar['data'] = sel['bar']
+            fig_bar['layout']['title']['text'] = sel['bar_title']
+            fig_bar['layout']['annotations'] = figures.annotations(sel['message'])
+            for prop, value in sel['map'].items():
+                fig_map['data'][0][prop] = value
+            fig_map['layout']['annotations'] = figures.annotations(sel['message'])
+            return fig_time, fig_bar, fig_map, metrics
+
+        shells = cache.get_or_build(f"{store.version}|visuals-shell|{selected_indicator}",
+                                    lambda: _shells(store.geojson_data, selected_indicator))
+        map_shell = shells['map']
+        fig_map = figures.figure(map_shell, [{**map_shell['data'][0], **sel['map']}], sel['message'])
+        return (
+            figures.figure(shells['time'], sel['time'], sel['message']),
+            figures.figure(shells['bar'], sel['bar'], sel['message'], title={'text': sel['bar_title']}),
+            fig_map,
+            metrics,
         )
 
-        # --- Kartu Metrik (Tetap Sama) ---
-        avg_value = filtered_df['Value'].mean()
-        max_row = filtered_df.loc[filtered_df['Value'].idxmax()]
-        metrics = [
-            dbc.Card(dbc.CardBody([html.H4("Average Value", className="card-title"), html.P(f"{avg_value:,.2f}", className="card-text fs-3")]), className="mb-3", color="light"),
-            dbc.Card(dbc.CardBody([html.H4("Highest Value", className="card-title"), html.P(f"{max_row['Value']:,.2f}", className="card-text fs-3"), html.Small(f"{max_row['Country']} ({max_row['Year']})", className="text-muted")]), className="mb-3", color="light"),
-        ]
+    def build_selection(store, selected_indicator, selected_countries, year_range, breakdown):
+        empty = {'time': [], 'bar': [], 'bar_title': '<b>Comparison in Latest Year</b>',
+                 'map': figures.choropleth_arrays(), 'metrics': None}
+        if not selected_countries:
+            return {**empty, 'message': 'Please select a country'}
+
+        # Grafik batang, peta dan kartu metrik dijawab dari tabel agregat
+        with instrumentation.stage('aggregate'):
+            summaries = store.cube.summarize(store.index, selected_indicator, selected_countries, year_range, breakdown)
+        if not summaries:
+            return {**empty, 'message': 'No data for selection'}
+
+        # Hanya grafik tren yang butuh baris observasi: blok seri dari indeks, lalu rentang tahun
+        with instrumentation.stage('filter'):
+            filtered_df = store.index.slice(selected_indicator, selected_countries, year_range, breakdown)
+        colors = figures.country_colors([s.country for s in summaries])
+
+        with instrumentation.stage('figure'):
+            return {
+                'time': figures.line_traces(filtered_df, colors),
+                'bar': figures.bar_traces(summaries, colors, 'h'),
+                'bar_title': f'<b>Comparison in Latest Year ({max(s.latest_year for s in summaries)})</b>',
+                'map': figures.choropleth_arrays(summaries),
+                'metrics': figures.metrics(summaries),
+                'message': None,
+            }
+
 
-        return fig_time, fig_bar, fig_map, metrics
\ No newline at end of file
+def _metric_cards(metrics):
+    if not metrics:
+        return []
+    return [
+        dbc.Card(dbc.CardBody([html.H4("Average Value", className="card-title"), html.P(f"{metrics['avg']:,.2f}", className="card-text fs-3")]), className="mb-3", color="light"),
+        dbc.Card(dbc.CardBody([html.H4("Highest Value", className="card-title"), html.P(f"{metrics['max']:,.2f}", className="card-text fs-3"), html.Small(f"{metrics['max_country']} ({metrics['max_year']})", className="text-muted")]), className="mb-3", color="light"),
+    ]
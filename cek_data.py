@@ -71,4 +71,11 @@ except Exception as e:
     print(f"Jenis Error: {type(e).__name__}")
     print(f"Pesan Error: {e}")
     import traceback
-    traceback.print_exc()
\ No newline at end of file
+    traceback.print_exc()
+
+# --- Laporan memori: CSV mentah vs tabel observasi ringkas di data_loader ---
+print("\n" + "="*50)
+print("LAPORAN MEMORI (data_loader.memory_report)")
+print("="*50)
+from data_loader import memory_report
+print(memory_report())
@@ -0,0 +1,114 @@
+# clientside.py
+#
+# Mode filter di browser untuk dasbor eksplorasi: tabel observasi dikirim sekali
+# dalam bentuk kolom yang ringkas ke dcc.Store, lalu filter indikator/negara/tahun
+# dan pembuatan trace dijalankan oleh callback clientside di
+# assets/dashboard_clientside.js. Server tidak menerima request saat slider digeser.
+#
+# Dataset yang lebih besar dari CLIENTSIDE_MAX_ROWS tetap memakai callback server.
+# Mode dipilih sekali saat callback didaftarkan; payload dcc.Store mengikuti mode itu
+# walaupun data hasil reload kemudian melewati batas (lihat warn_outgrown).
+
+import os
+
+import aggregates
+import data_loader
+import figures
+
+# 'auto' = clientside jika jumlah baris <= CLIENTSIDE_MAX_ROWS; 'client' / 'server' = paksa
+DASHBOARD_MODE = os.environ.get("DASHBOARD_MODE", "auto")
+CLIENTSIDE_MAX_ROWS = int(os.environ.get("CLIENTSIDE_MAX_ROWS", 50000))
+
+# Namespace fungsi di window.dash_clientside (lihat assets/dashboard_clientside.js)
+NAMESPACE = "blue_pacific"
+
+
+def enabled(store):
+    if store.df.empty or DASHBOARD_MODE == "server":
+        return False
+    return DASHBOARD_MODE == "client" or len(store.df) <= CLIENTSIDE_MAX_ROWS
+
+
+_startup = None
+_outgrown = set()
+
+
+def startup_enabled():
+    """Mode yang dipakai saat callback didaftarkan (impor halaman), sekali per proses.
+
+    Jumlah baris diambil dari metadata cache biner (data_loader.cached_rows), atau jika
+    cache belum ada (deploy baru, DATA_CACHE=0) dari jumlah baris CSV sumber
+    (data_loader.source_rows); impor halaman tidak pernah memuat data. Keduanya batas
+    atas, jadi mode clientside tidak pernah dipilih untuk dataset yang sebenarnya
+    melebihi CLIENTSIDE_MAX_ROWS.
+    """
+    global _startup
+    if _startup is None:
+        if DASHBOARD_MODE == "server":
+            _startup = False
+        else:
+            rows = data_loader.cached_rows()
+            if rows is None:
+                rows = data_loader.source_rows(limit=CLIENTSIDE_MAX_ROWS)
+            _startup = rows > 0 and (DASHBOARD_MODE == "client" or rows <= CLIENTSIDE_MAX_ROWS)
+    return _startup
+
+
+def warn_outgrown(store):
+    """Mencatat (sekali per versi data) store yang melebihi CLIENTSIDE_MAX_ROWS padahal
+    callback clientside sudah terdaftar, mis. setelah hot reload.
+
+    Callback tidak bisa didaftarkan ulang, jadi payload tetap dikirim; mode server
+    baru dipakai setelah worker di-restart.
+    """
+    if DASHBOARD_MODE != "auto" or len(store.df) <= CLIENTSIDE_MAX_ROWS or store.version in _outgrown:
+        return
+    _outgrown.add(store.version)
+    print(f"[clientside] {len(store.df)} baris melebihi CLIENTSIDE_MAX_ROWS={CLIENTSIDE_MAX_ROWS}; "
+          f"mode clientside tetap dipakai sampai worker di-restart")
+
+
+def payload(store, shells, include_geojson=False):
+    """Encoding kolom tabel observasi untuk dcc.Store.
+
+    Kode indikator/negara/breakdown dikirim sekali sebagai kamus; setiap seri
+    (indikator, negara, breakdown) adalah rentang [start, stop) di array
+    `year`/`value`, yang terurut menurut tahun seperti di SliceIndex. Breakdown
+    memakai string yang sama dengan nilai dropdown (aggregates.format_breakdown).
+    `shells` adalah shell figure dari modul figures; layout-nya dikirim tanpa
+    template (template dikirim sekali) dan trace shell (mis. choropleth) tanpa GeoJSON.
+    """
+    df = store.df
+    indicators = df['Indicator'].cat.categories.tolist()
+    countries = df['Country'].cat.categories.tolist()
+    ind_pos = {name: i for i, name in enumerate(indicators)}
+    cty_pos = {name: i for i, name in enumerate(countries)}
+    breakdowns = sorted({key[2] for key, _ in store.index.blocks()})
+    brk_pos = {b: i for i, b in enumerate(breakdowns)}
+    iso = (df.drop_duplicates('Country').set_index('Country')['iso_alpha'].astype(object)
+           .reindex(countries).tolist())
+
+    return {
+        'indicators': indicators,
+        'countries': countries,
+        'iso': [c if isinstance(c, str) else None for c in iso],
+        'breakdowns': [aggregates.format_breakdown(b) for b in breakdowns],
+        # Breakdown bawaan per indikator, dipakai sebelum dropdown terisi
+        'defaults': {ind: aggregates.format_breakdown(store.cube.default_breakdown(ind)) for ind in indicators},
+        'blocks': [[ind_pos[i], cty_pos[c], brk_pos[b], start, stop]
+                   for (i, c, b), (start, stop) in store.index.blocks()],
+        'year': df['Year'].tolist(),
+        'value': figures.values(df['Value']),
+        'colorway': figures.COLORWAY,
+        'webgl_points': figures.WEBGL_POINTS,
+        'template': figures.template(),
+        'layouts': {
+            name: {k: v for k, v in shell['layout'].items() if k != 'template'}
+            for name, shell in shells.items()
+        },
+        'traces': {
+            name: [{k: v for k, v in trace.items() if k != 'geojson'} for trace in shell['data']]
+            for name, shell in shells.items()
+        },
+        'geojson': store.geojson_data if include_geojson else None,
+    }
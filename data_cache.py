@@ -0,0 +1,179 @@
+# data_cache.py
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+# Naikkan angka ini setiap kali logika pembersihan di data_loader berubah,
+# supaya cache lama dianggap usang walaupun file CSV-nya sama.
+CACHE_VERSION = 4
+
+CACHE_ROOT = os.environ.get(
+    "DATA_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"),
+)
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cache_dir(source_path):
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in stem)
+    return os.path.join(CACHE_ROOT, safe)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json_atomic(path, obj):
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(obj, f)
+    os.replace(tmp, path)
+
+
+def source_fingerprint(source_path):
+    """Mengembalikan SHA-256 file sumber.
+
+    Jika ukuran dan mtime masih sama dengan yang tercatat di cache, hash yang
+    tersimpan dipakai ulang sehingga file besar tidak perlu dibaca ulang.
+    """
+    st = os.stat(source_path)
+    current = _read_json(os.path.join(_cache_dir(source_path), "current.json"))
+    if current and current.get("size") == st.st_size and current.get("mtime_ns") == st.st_mtime_ns:
+        return current["sha256"]
+    return file_sha256(source_path)
+
+
+def cached_rows(source_path):
+    """Jumlah baris di bundle cache yang masih cocok dengan `source_path` (cek ukuran/mtime), atau None.
+
+    Hanya membaca metadata JSON; dipakai untuk keputusan saat startup tanpa memuat data.
+    """
+    base = _cache_dir(source_path)
+    current = _read_json(os.path.join(base, "current.json"))
+    try:
+        st = os.stat(source_path)
+    except OSError:
+        return None
+    if not current or current.get("version") != CACHE_VERSION:
+        return None
+    if current.get("size") != st.st_size or current.get("mtime_ns") != st.st_mtime_ns:
+        return None
+    meta = _read_json(os.path.join(base, current["dir"], "meta.json"))
+    return meta.get("rows") if meta else None
+
+
+# --- Penulisan dan pembacaan bundle kolom ---
+
+def _write_bundle(df, extra, path):
+    os.makedirs(path)
+    columns = []
+    for i, name in enumerate(df.columns):
+        col = df[name]
+        fname = f"col_{i}.npy"
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            kind = "category"
+            np.save(os.path.join(path, fname), col.cat.codes.to_numpy())
+            info = {"categories": col.cat.categories.tolist(), "ordered": bool(col.cat.ordered)}
+        elif col.dtype.kind in "biuf":
+            kind = "numeric"
+            np.save(os.path.join(path, fname), col.to_numpy())
+            info = {}
+        else:
+            # Kolom teks disimpan sebagai kode integer + daftar nilai unik
+            kind = "text"
+            codes, uniques = pd.factorize(col)
+            np.save(os.path.join(path, fname), codes.astype(np.int32))
+            info = {"categories": [str(u) for u in uniques]}
+        columns.append({"name": name, "file": fname, "kind": kind, "dtype": str(col.dtype), **info})
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"rows": len(df), "columns": columns, "extra": extra}, f)
+
+
+def _read_bundle(path):
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    data = {}
+    for col in meta["columns"]:
+        # mmap_mode='r': halaman file dibagi antar proses lewat page cache OS
+        arr = np.load(os.path.join(path, col["file"]), mmap_mode="r")
+        if col["kind"] == "numeric":
+            data[col["name"]] = arr
+        else:
+            cat = pd.Categorical.from_codes(arr, categories=col["categories"], ordered=col.get("ordered", False))
+            data[col["name"]] = cat if col["kind"] == "category" else pd.Series(cat).astype(col["dtype"]).to_numpy()
+    df = pd.DataFrame(data, index=pd.RangeIndex(meta["rows"]), copy=False)
+    return df, meta.get("extra", {})
+
+
+def load_cached(source_path, build):
+    """Memuat (DataFrame, extra) dari cache biner, atau membangunnya dengan `build(source_path)`.
+
+    Cache dikunci pada SHA-256 file sumber dan CACHE_VERSION; perubahan isi CSV
+    otomatis memicu pembangunan ulang. `extra` adalah dict kecil yang bisa di-JSON-kan
+    (mis. kamus label) dan disimpan bersama bundle. Kolom numerik dan kode kategori dikembalikan
+    sebagai memmap read-only: salin dulu (`.copy()`) sebelum memodifikasi frame.
+    """
+    base = _cache_dir(source_path)
+    pointer = os.path.join(base, "current.json")
+    st = os.stat(source_path)
+    current = _read_json(pointer)
+
+    if current and current.get("version") == CACHE_VERSION:
+        bundle = os.path.join(base, current["dir"])
+        same_stat = current.get("size") == st.st_size and current.get("mtime_ns") == st.st_mtime_ns
+        if same_stat or file_sha256(source_path) == current.get("sha256"):
+            try:
+                result = _read_bundle(bundle)
+            except (OSError, ValueError, KeyError):
+                result = None
+            if result is not None:
+                if not same_stat:
+                    # Isi sama, hanya mtime yang berubah (mis. git checkout)
+                    _write_json_atomic(pointer, {**current, "size": st.st_size, "mtime_ns": st.st_mtime_ns})
+                return result
+
+    sha = file_sha256(source_path)
+    df, extra = build(source_path)
+    dirname = f"v{CACHE_VERSION}-{sha[:16]}"
+    bundle = os.path.join(base, dirname)
+    os.makedirs(base, exist_ok=True)
+    if not os.path.isdir(bundle):
+        tmp = f"{bundle}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        _write_bundle(df, extra, tmp)
+        try:
+            os.rename(tmp, bundle)
+        except OSError:
+            # Worker lain sudah lebih dulu menulis bundle yang sama
+            shutil.rmtree(tmp, ignore_errors=True)
+    _write_json_atomic(pointer, {
+        "version": CACHE_VERSION, "sha256": sha, "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns, "dir": dirname,
+    })
+    _remove_stale_bundles(base, keep=dirname)
+    return _read_bundle(bundle)
+
+
+def _remove_stale_bundles(base, keep):
+    # File yang sedang di-mmap proses lain tetap valid setelah dihapus (Linux)
+    for name in os.listdir(base):
+        full = os.path.join(base, name)
+        if name != keep and ".tmp-" not in name and os.path.isdir(full):
+            shutil.rmtree(full, ignore_errors=True)
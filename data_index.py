@@ -0,0 +1,103 @@
+# data_index.py
+
+import numpy as np
+
+# Dimensi rincian SDMX; bersama Indicator dan Country membentuk kunci seri
+BREAKDOWN_COLUMNS = [
+    'SEX', 'AGE', 'URBANIZATION', 'INCOME', 'EDUCATION', 'OCCUPATION', 'COMPOSITE_BREAKDOWN', 'DISABILITY',
+]
+SERIES_COLUMNS = ['Indicator', 'Country'] + BREAKDOWN_COLUMNS
+# Urutan baris yang diharapkan indeks; data_loader menyimpan tabel observasi dalam urutan ini
+SORT_COLUMNS = SERIES_COLUMNS + ['Year']
+
+
+class SliceIndex:
+    """Indeks kunci seri (Indicator, Country, breakdown) -> blok baris bersebelahan
+    yang terurut menurut Year.
+
+    `breakdown` adalah tuple kode untuk BREAKDOWN_COLUMNS, mis. ('F', 'Y15T24', '_T', ...).
+    Callback cukup mengambil blok seri yang dipilih lalu mencari rentang tahun
+    dengan binary search di dalam blok, sehingga biayanya sebanding dengan ukuran
+    pilihan, bukan ukuran seluruh tabel atau banyaknya dimensi.
+    """
+
+    def __init__(self, df):
+        self._series = {}
+        if df.empty or not set(SORT_COLUMNS).issubset(df.columns):
+            self.df = df
+            self._years = np.empty(0, dtype=np.int16)
+            self._blocks = {}
+            return
+
+        if not _is_sorted(df):
+            df = df.sort_values(SORT_COLUMNS, kind='stable').reset_index(drop=True)
+        self.df = df
+        self._years = df['Year'].to_numpy()
+
+        codes = [df[c].cat.codes.to_numpy() for c in SERIES_COLUMNS]
+        change = np.zeros(max(len(df) - 1, 0), dtype=bool)
+        for c in codes:
+            change |= c[1:] != c[:-1]
+        change = np.flatnonzero(change) + 1
+        starts = np.concatenate(([0], change))
+        stops = np.concatenate((change, [len(df)]))
+        # Nama kategori per dimensi untuk setiap awal blok
+        names = [np.asarray(df[c].cat.categories, dtype=object)[code[starts]]
+                 for c, code in zip(SERIES_COLUMNS, codes)]
+        self._blocks = {}
+        for pos, (s, e) in enumerate(zip(starts, stops)):
+            indicator, country = names[0][pos], names[1][pos]
+            breakdown = tuple(n[pos] for n in names[2:])
+            self._blocks[(indicator, country, breakdown)] = (int(s), int(e))
+            self._series.setdefault((indicator, country), []).append(breakdown)
+
+    def blocks(self):
+        """Pasangan ((indikator, negara, breakdown), (start, stop)) dalam urutan baris."""
+        return self._blocks.items()
+
+    def countries(self, indicator):
+        """Negara yang punya data untuk indikator ini."""
+        return [c for (i, c) in self._series if i == indicator]
+
+    def breakdowns(self, indicator, country):
+        """Breakdown yang tersedia untuk (indikator, negara)."""
+        return list(self._series.get((indicator, country), []))
+
+    def positions(self, indicator, countries=None, year_range=None, breakdown=None):
+        """Posisi baris (iloc) untuk indikator, negara, breakdown dan rentang tahun [awal, akhir].
+
+        Tanpa `breakdown`, semua seri (indikator, negara) ikut, satu blok per breakdown.
+        """
+        if countries is None:
+            countries = self.countries(indicator)
+        parts = []
+        for country in countries:
+            if breakdown is None:
+                keys = self._series.get((indicator, country), [])
+            else:
+                keys = [tuple(breakdown)]
+            for key in keys:
+                block = self._blocks.get((indicator, country, key))
+                if block is None:
+                    continue
+                start, stop = block
+                if year_range is not None:
+                    years = self._years[start:stop]
+                    lo = start + int(np.searchsorted(years, year_range[0], side='left'))
+                    hi = start + int(np.searchsorted(years, year_range[1], side='right'))
+                    start, stop = lo, hi
+                if stop > start:
+                    parts.append(np.arange(start, stop))
+        if not parts:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate(parts)
+
+    def slice(self, indicator, countries=None, year_range=None, breakdown=None):
+        """Baris yang cocok sebagai DataFrame (urut per negara, lalu per tahun)."""
+        return self.df.iloc[self.positions(indicator, countries, year_range, breakdown)]
+
+
+def _is_sorted(df):
+    keys = [df[c].cat.codes.to_numpy() for c in SERIES_COLUMNS] + [df['Year'].to_numpy()]
+    order = np.lexsort(keys[::-1])
+    return bool((order == np.arange(len(order))).all())
@@ -1,38 +1,265 @@
+import glob
+import hashlib
+import os
 import pandas as pd
 import json
+from pandas.api.types import union_categoricals
+
+import data_cache
+import geo_assets
+import instrumentation
+from data_index import BREAKDOWN_COLUMNS, SORT_COLUMNS
+
+# Path dihitung dari lokasi modul agar tidak bergantung pada direktori kerja gunicorn
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CSV_PATH = os.path.join(BASE_DIR, "Blue Pacific 2050_ Technology And Connectivity (Thematic Area 7) data.csv")
+GEOJSON_PATH = os.path.join(BASE_DIR, "data", "countries.geojson")
+# Ekspor SDMX tambahan (area tematik lain, refresh berkala); semua *.csv di sini ikut dimuat
+SDMX_DIR = os.environ.get("SDMX_DIR", os.path.join(BASE_DIR, "data", "sdmx"))
+# Banyak baris CSV mentah yang dibaca sekaligus; membatasi memori saat membaca ekspor besar
+CHUNK_ROWS = int(os.environ.get("INGEST_CHUNK_ROWS", 100000))
+
+# Pemetaan negara dari kode 2-huruf ke kode 3-huruf
+COUNTRY_MAPPING = {
+    "CK": "COK", "FJ": "FJI", "FM": "FSM", "KI": "KIR", "MH": "MHL", "NC": "NCL",
+    "NR": "NRU", "NU": "NIU", "PF": "PYF", "PG": "PNG", "PW": "PLW", "SB": "SLB",
+    "TO": "TON", "TV": "TUV", "VU": "VUT", "WS": "WSM"
+}
+
+# Kolom kode yang dipakai aplikasi -> kolom label pasangannya di ekspor SDMX.
+# Label dipindah ke kamus kecil; tabel observasi hanya menyimpan kodenya.
+CODE_LABEL_COLUMNS = {
+    'INDICATOR': 'Indicator',
+    'GEO_PICT': 'Pacific Island Countries and territories',
+    'SEX': 'Sex',
+    'AGE': 'Age',
+    'URBANIZATION': 'Urbanization',
+    'INCOME': 'Income',
+    'EDUCATION': 'Education level',
+    'OCCUPATION': 'Occupation',
+    'COMPOSITE_BREAKDOWN': 'Composite breakdown',
+    'DISABILITY': 'Disability',
+    'UNIT_MEASURE': 'Unit of measure',
+}
+
+# Skema tabel observasi yang disimpan di memori
+CATEGORY_COLUMNS = ['Indicator', 'Country'] + BREAKDOWN_COLUMNS + ['UNIT_MEASURE', 'iso_alpha']
+OBSERVATION_COLUMNS = CATEGORY_COLUMNS + ['Year', 'Value']
+# Satu observasi = kunci seri + periode waktu (SORT_COLUMNS); duplikat dibuang, yang terakhir menang
+RAW_COLUMNS = {'INDICATOR', 'GEO_PICT', 'TIME_PERIOD', 'OBS_VALUE', 'UNIT_MEASURE', *BREAKDOWN_COLUMNS,
+               *CODE_LABEL_COLUMNS.values()}
+
+def source_paths():
+    """File CSV SDMX yang membentuk dataset: CSV utama lalu isi SDMX_DIR (urut nama)."""
+    paths = [CSV_PATH] if os.path.exists(CSV_PATH) else []
+    return paths + sorted(glob.glob(os.path.join(SDMX_DIR, "*.csv")))
+
+def source_stats(paths=None):
+    """{path: 'ukuran-mtime'} untuk mendeteksi file sumber yang berubah tanpa membacanya."""
+    stats = {}
+    for path in source_paths() if paths is None else paths:
+        st = os.stat(path)
+        stats[path] = f"{st.st_size}-{st.st_mtime_ns}"
+    return stats
+
+def cached_rows():
+    """Perkiraan atas jumlah observasi dari metadata cache biner (sebelum deduplikasi antar
+    file), tanpa membaca data; None jika cache dimatikan atau belum ada untuk semua sumber."""
+    if os.environ.get("DATA_CACHE", "1") == "0":
+        return None
+    total = 0
+    for path in source_paths():
+        rows = data_cache.cached_rows(path)
+        if rows is None:
+            return None
+        total += rows
+    return total
+
+def source_rows(limit=None):
+    """Perkiraan atas jumlah observasi dari jumlah baris data CSV sumber, tanpa mem-parse.
+
+    Berhenti menghitung begitu `limit` terlampaui (hasilnya lalu > limit), jadi biayanya
+    terbatas walaupun ekspornya besar.
+    """
+    total = 0
+    for path in source_paths():
+        with open(path, "rb") as f:
+            total -= 1  # baris header
+            for block in iter(lambda: f.read(1 << 20), b""):
+                total += block.count(b"\n")
+                if limit is not None and total > limit:
+                    return total
+            if block and not block.endswith(b"\n"):
+                total += 1  # baris terakhir tanpa newline
+    return max(total, 0)
+
+def data_version():
+    """Sidik pendek untuk isi data saat ini (CSV + GeoJSON), tanpa memuat datanya.
+
+    Dipakai sebagai kunci validitas oleh cache turunan: figure, build naratif, dll.
+    """
+    parts = [geo_assets.cache_suffix()]
+    for path in [*source_paths(), GEOJSON_PATH]:
+        try:
+            if path == GEOJSON_PATH:
+                st = os.stat(path)
+                parts.append(f"{st.st_size}-{st.st_mtime_ns}")
+            else:
+                parts.append(data_cache.source_fingerprint(path))
+        except OSError:
+            parts.append("missing")
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
 
 def load_data():
     """Memuat dan memproses semua data yang dibutuhkan."""
+    df, _, geojson_data = load_dataset()
+    return df, geojson_data
+
+def load_dataset():
+    """Seperti load_data(), tetapi juga mengembalikan kamus label kode."""
     try:
-        df = pd.read_csv("Blue Pacific 2050_ Technology And Connectivity (Thematic Area 7) data.csv")
-        with open("data/countries.geojson", 'r') as f:
-            geojson_data = json.load(f)
+        paths = source_paths()
+        if len(paths) > 1:
+            # Beberapa ekspor: masing-masing lewat cache binernya, lalu digabung
+            frames, labels = [], {}
+            with instrumentation.stage("observations"):
+                for path in paths:
+                    part, part_labels = load_observations(path)
+                    frames.append(part)
+                    merge_labels(labels, part_labels)
+                df = combine_observations(frames)
+        else:
+            with instrumentation.stage("observations"):
+                df, labels = load_observations()
+        with instrumentation.stage("geojson"):
+            geojson_data = load_geojson()
     except Exception as e:
         print(f"Error loading data files: {e}")
-        return pd.DataFrame(), None
+        return pd.DataFrame(), {}, None
+    return df, labels, geojson_data
+
+def load_observations(path=CSV_PATH):
+    """Memuat tabel observasi bersih dan label kodenya, lewat cache biner bila tersedia."""
+    if os.environ.get("DATA_CACHE", "1") == "0":
+        return read_observations(path)
+    return data_cache.load_cached(path, read_observations)
+
+def load_geojson(path=GEOJSON_PATH):
+    """GeoJSON negara yang sudah difilter ke wilayah Pasifik dan disederhanakan (lihat geo_assets)."""
+    return geo_assets.prepare_geojson(path, COUNTRY_MAPPING.values())
 
+def read_observations(path=CSV_PATH):
+    """Membaca CSV SDMX mentah dan membersihkannya (tanpa cache), per potongan CHUNK_ROWS baris."""
+    frames, labels = [], {}
+    for chunk, chunk_labels in read_chunks(path):
+        frames.append(chunk)
+        merge_labels(labels, chunk_labels)
+    return combine_observations(frames), labels
+
+def read_chunks(path, chunksize=None):
+    """Generator (observasi bersih, label) per potongan CSV.
+
+    Hanya kolom yang dipakai aplikasi yang dibaca, dan hanya satu potongan mentah
+    yang ada di memori pada satu waktu; yang disimpan pemanggil adalah tabel ringkasnya.
+    """
+    reader = pd.read_csv(path, usecols=lambda c: c in RAW_COLUMNS, chunksize=chunksize or CHUNK_ROWS)
+    with reader:
+        for raw in reader:
+            yield clean_observations(raw), extract_labels(raw)
+
+def merge_labels(labels, new_labels):
+    """Menggabungkan kamus label `new_labels` ke `labels` (di tempat)."""
+    for col, mapping in new_labels.items():
+        labels.setdefault(col, {}).update(mapping)
+    return labels
+
+def combine_observations(frames):
+    """Menggabungkan beberapa tabel observasi bersih menjadi satu.
+
+    Kategori disatukan (agar kolom tetap bertipe category), observasi dengan kunci
+    seri + tahun yang sama hanya disimpan sekali (yang datang terakhir menang), lalu
+    tabel diurutkan lagi per seri.
+    """
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=OBSERVATION_COLUMNS)
+    if len(frames) == 1:
+        df = frames[0]
+    else:
+        data = {}
+        for col in frames[0].columns:
+            if col in CATEGORY_COLUMNS:
+                # Kolom yang kosong di satu ekspor punya kategori bertipe lain; samakan ke string
+                cats = [f[col].array.rename_categories(f[col].cat.categories.astype(str)) for f in frames]
+                data[col] = union_categoricals(cats, sort_categories=True)
+            else:
+                data[col] = pd.concat([f[col] for f in frames], ignore_index=True)
+        df = pd.DataFrame(data)
+    duplicated = df.duplicated(subset=SORT_COLUMNS, keep='last').to_numpy()
+    if len(frames) == 1 and not duplicated.any():
+        return df
+    df = df[~duplicated].sort_values(SORT_COLUMNS, kind='stable')
+    df.reset_index(drop=True, inplace=True)
+    return df
+
+def extract_labels(raw):
+    """Kamus {kolom: {kode: label}} dari pasangan kolom kode/label SDMX."""
+    rename_map = {'INDICATOR': 'Indicator', 'GEO_PICT': 'Country'}
+    labels = {}
+    for code_col, label_col in CODE_LABEL_COLUMNS.items():
+        if code_col in raw.columns and label_col in raw.columns:
+            pairs = raw[[code_col, label_col]].drop_duplicates(subset=code_col).dropna()
+            labels[rename_map.get(code_col, code_col)] = dict(zip(pairs[code_col], pairs[label_col]))
+    return labels
+
+def clean_observations(df):
     # --- Preprocessing ---
     rename_map = {
         'INDICATOR': 'Indicator', 'GEO_PICT': 'Country', 'TIME_PERIOD': 'Year', 'OBS_VALUE': 'Value'
     }
-    df.rename(columns={k: v for k, v in rename_map.items() if k in df.columns}, inplace=True)
+    df = df.rename(columns={k: v for k, v in rename_map.items() if k in df.columns})
 
-    # Hapus kolom duplikat jika ada
+    # Hapus kolom duplikat jika ada (kode 'INDICATOR' dan label 'Indicator' bertabrakan)
     df = df.loc[:,~df.columns.duplicated()]
 
     df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
     df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
-    df.dropna(subset=['Year', 'Value'], inplace=True)
-    df['Year'] = df['Year'].astype(int)
-
-    # Pemetaan negara dari kode 2-huruf ke kode 3-huruf
-    country_mapping = {
-        "CK": "COK", "FJ": "FJI", "FM": "FSM", "KI": "KIR", "MH": "MHL", "NC": "NCL",
-        "NR": "NRU", "NU": "NIU", "PF": "PYF", "PG": "PNG", "PW": "PLW", "SB": "SLB",
-        "TO": "TON", "TV": "TUV", "VU": "VUT", "WS": "WSM"
-    }
+    df = df.dropna(subset=['Year', 'Value'])
+
     if 'Country' in df.columns:
-        df['iso_alpha'] = df['Country'].map(country_mapping)
+        df['iso_alpha'] = df['Country'].map(COUNTRY_MAPPING)
+
+    # Setiap baris harus punya kunci seri lengkap; dimensi yang tidak ada di ekspor
+    # dianggap "tidak berlaku" (_Z) agar seri tetap terpisah dan bisa diindeks
+    for col in BREAKDOWN_COLUMNS:
+        df[col] = df[col].fillna('_Z') if col in df.columns else '_Z'
+
+    # Proyeksi ke kolom yang dipakai aplikasi saja (skema sama untuk setiap ekspor), dengan tipe yang ringkas
+    df = df.reindex(columns=OBSERVATION_COLUMNS)
+    df = df.astype({c: 'category' for c in CATEGORY_COLUMNS if c in df.columns})
+    df = df.astype({'Year': 'int16', 'Value': 'float32'})
+
+    # Urutkan per kunci seri lalu Year agar setiap seri menjadi blok bersebelahan
+    if set(SORT_COLUMNS).issubset(df.columns):
+        df = df.sort_values(SORT_COLUMNS, kind='stable')
 
     df.reset_index(drop=True, inplace=True)
-    return df, geojson_data
\ No newline at end of file
+    return df
+
+def memory_report(path=CSV_PATH):
+    """Membandingkan jejak memori CSV mentah dengan tabel observasi ringkas."""
+    raw = pd.read_csv(path)
+    raw_bytes = raw.memory_usage(deep=True).sum()
+    slim, labels = read_observations(path)
+    slim_usage = slim.memory_usage(deep=True)
+    label_bytes = len(json.dumps(labels).encode())
+    lines = [
+        f"Sebelum : {raw_bytes / 1024 ** 2:8.2f} MB  ({raw.shape[0]} baris x {raw.shape[1]} kolom)",
+        f"Sesudah : {slim_usage.sum() / 1024 ** 2:8.2f} MB  ({slim.shape[0]} baris x {slim.shape[1]} kolom)"
+        f" + label {label_bytes / 1024:.1f} KB",
+        f"Rasio   : {raw_bytes / max(slim_usage.sum() + label_bytes, 1):8.1f}x",
+    ]
+    for col, nbytes in slim_usage.items():
+        dtype = slim[col].dtype if col in slim.columns else ''
+        lines.append(f"  {col:<14} {str(dtype):<10} {nbytes / 1024:8.1f} KB")
+    return "\n".join(lines)
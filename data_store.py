@@ -0,0 +1,185 @@
+# data_store.py
+
+import gc
+import os
+import threading
+import time
+
+import instrumentation
+from aggregates import SummaryCube
+from data_index import SliceIndex
+from data_loader import data_version, load_dataset, source_stats
+
+# Satu salinan data per proses, dipakai bersama oleh semua halaman dan callback.
+# Sekali dimuat, store dipegang selama proses hidup; hanya reload() yang menggantinya.
+_lock = threading.Lock()
+# Hanya satu reload pada satu waktu; tidak menghalangi current()
+_reload_lock = threading.Lock()
+_store = None
+_reload_listeners = []
+
+
+class DataStore:
+    """Wadah data yang sudah dimuat: DataFrame observasi, label kode dan GeoJSON negara."""
+
+    def __init__(self, df, geojson_data, load_seconds, labels=None, version="empty", cube=None, sources=None):
+        # Indeks dibangun sekali di sini; ia juga menjamin df terurut per seri
+        with instrumentation.stage("index"):
+            self.index = SliceIndex(df)
+        self.df = self.index.df
+        # Ringkasan per seri untuk grafik batang, peta dan kartu metrik
+        # (ingest.refresh memberikan salinan cube lama yang diperbarui per seri)
+        with instrumentation.stage("cube"):
+            self.cube = cube if cube is not None else SummaryCube(self.df)
+        self.geojson_data = geojson_data
+        self.labels = labels or {}
+        self.year_bounds = None if self.df.empty else (int(self.df['Year'].min()), int(self.df['Year'].max()))
+        self.load_seconds = load_seconds
+        # Sidik isi data; dipakai cache turunan (mis. figure_cache) sebagai kunci validitas
+        self.version = version
+        # {path: 'ukuran-mtime'} file sumber saat dimuat; dipakai ingest.refresh
+        self.sources = sources or {}
+        self.pid = os.getpid()
+
+    def data_mb(self):
+        """Perkiraan memori yang dipakai DataFrame (termasuk isi string), dalam MB."""
+        if self.df is None or self.df.empty:
+            return 0.0
+        return self.df.memory_usage(deep=True).sum() / 1024 ** 2
+
+    def report(self):
+        """Ringkasan satu baris untuk log startup."""
+        rss, pss = process_memory_mb()
+        parts = [
+            f"pid={os.getpid()}",
+            f"rows={len(self.df)}",
+            f"load={self.load_seconds:.3f}s",
+            f"data={self.data_mb():.2f}MB",
+            f"rss={rss:.1f}MB",
+        ]
+        if pss is not None:
+            parts.append(f"pss={pss:.1f}MB")
+        return "[data_store] " + " ".join(parts)
+
+
+def process_memory_mb():
+    """Mengembalikan (RSS, PSS) proses saat ini dalam MB; PSS None jika tidak tersedia.
+
+    PSS membagi halaman copy-on-write secara adil antar worker, jadi angka ini yang
+    sebaiknya dibandingkan saat memeriksa efek preload di master gunicorn.
+    """
+    rss, pss = 0.0, None
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss = int(line.split()[1]) / 1024
+                    break
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    pss = int(line.split()[1]) / 1024
+                    break
+    except OSError:
+        import resource
+        # Di luar Linux hanya puncak RSS yang tersedia (macOS melaporkan dalam byte)
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        rss = maxrss / 1024 ** 2 if os.uname().sysname == "Darwin" else maxrss / 1024
+    return rss, pss
+
+
+def _build():
+    start = time.perf_counter()
+    # Stat dicatat sebelum membaca: file yang berubah selama pemuatan ikut di refresh berikutnya
+    sources = source_stats()
+    # Durasi per tahap (observasi, geojson, indeks, cube) untuk metrik blue_pacific_data_load_seconds
+    with instrumentation.collect() as timings:
+        df, labels, geojson_data = load_dataset()
+        store = DataStore(df, geojson_data, time.perf_counter() - start, labels, data_version(), sources=sources)
+    store.load_seconds = time.perf_counter() - start
+    instrumentation.record_load(timings, store.load_seconds)
+    return store
+
+
+def _load():
+    store = _build()
+    print(store.report())
+    _notify(store)
+    return store
+
+
+def _notify(store):
+    for listener in list(_reload_listeners):
+        listener(store)
+
+
+def current():
+    """Store yang aktif saat ini, untuk dipakai sekali per request.
+
+    Data dimuat pada pemanggilan pertama di proses ini dan dipegang sampai proses
+    berakhir; pemanggil berikutnya menerima objek yang sama. Callback sebaiknya mengambil store sekali di awal lalu memakai objek itu sampai
+    selesai; reload() hanya mengganti referensi ini, jadi request yang sedang
+    berjalan tetap melihat data yang konsisten.
+    """
+    global _store
+    store = _store
+    if store is None:
+        with _lock:
+            if _store is None:
+                _store = _load()
+            store = _store
+    return store
+
+
+def reload(full=False):
+    """Membangun store baru dari file data lalu menukarnya secara atomik.
+
+    Pembangunan berjalan di thread pemanggil tanpa memegang _lock, sehingga request
+    lain tetap dilayani dari store lama. Jika hanya ekspor SDMX yang berubah, dipakai
+    refresh inkremental (ingest.refresh); jika GeoJSON berubah atau ada file sumber
+    yang hilang, store dibangun ulang penuh. Mengembalikan store baru, atau None jika
+    data tidak berubah.
+    """
+    global _store
+    import ingest
+
+    with _reload_lock:
+        old = _store
+        if old is None:
+            return None
+        store = None
+        if old.sources and not set(old.sources) <= set(source_stats()):
+            # Ekspor yang dihapus tidak bisa dikeluarkan secara inkremental
+            full = True
+        if not full and old.sources:
+            store = ingest.refresh(old)
+            full = store is None and data_version() != old.version
+        if full:
+            store = _build()
+        if store is None:
+            return None
+        with _lock:
+            if _store is old:
+                _store = store
+        print(store.report())
+        # Listener (mis. figure_cache) membuang turunan dari versi lama
+        _notify(store)
+        return store
+
+
+def on_reload(listener):
+    """Mendaftarkan `listener(store)` yang dipanggil setiap kali data (ulang) dimuat."""
+    _reload_listeners.append(listener)
+
+
+def preload():
+    """Memuat data di master gunicorn sebelum fork.
+
+    Worker hasil fork mewarisi modul ini beserta datanya, sehingga halaman memori
+    dibagi secara copy-on-write. gc.freeze() mencegah siklus GC di worker menyentuh
+    objek-objek tersebut (dan menyalin halamannya).
+    """
+    store = current()
+    gc.collect()
+    gc.freeze()
+    return store
@@ -0,0 +1,177 @@
+# figure_cache.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import plotly.utils
+
+import data_store
+import instrumentation
+
+# Konfigurasi lewat environment agar bisa diatur per deployment tanpa mengubah kode
+FIGURE_CACHE_SIZE = int(os.environ.get("FIGURE_CACHE_SIZE", 128))
+FIGURE_CACHE_BACKEND = os.environ.get("FIGURE_CACHE_BACKEND", "memory")
+FIGURE_CACHE_PATH = os.environ.get(
+    "FIGURE_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "figures.sqlite3"),
+)
+
+
+class MemoryBackend:
+    """LRU di memori proses; nilai disimpan apa adanya (tanpa serialisasi)."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def set(self, key, value):
+        """Menyimpan nilai; mengembalikan jumlah entri yang dikeluarkan."""
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            evicted = 0
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def invalidate(self, version):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class SQLiteBackend:
+    """LRU dalam file SQLite, dipakai bersama oleh semua worker gunicorn di mesin yang sama."""
+
+    def __init__(self, maxsize, path):
+        self.maxsize = maxsize
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS figures ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS figures_last_used ON figures (last_used)")
+
+    def _connect(self):
+        # Satu koneksi per thread (dan per proses: koneksi tidak boleh diwarisi lewat fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        row = conn.execute("SELECT value FROM figures WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute("UPDATE figures SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        payload = json.dumps(value, cls=plotly.utils.PlotlyJSONEncoder)
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO figures (key, value, last_used) VALUES (?, ?, ?)",
+                (key, payload, time.time()),
+            )
+            cur = conn.execute(
+                "DELETE FROM figures WHERE key IN ("
+                "SELECT key FROM figures ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+        return max(cur.rowcount, 0)
+
+    def invalidate(self, version):
+        # Worker lain mungkin masih menulis versi lama; hapus semua yang bukan versi ini
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM figures WHERE substr(key, 1, ?) != ?", (len(version) + 1, version + "|"))
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM figures").fetchone()[0]
+
+
+class FigureCache:
+    """Cache keluaran callback (figure sebagai dict) dengan penghitung hit/miss."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_build(self, key, build):
+        value = self.backend.get(key)
+        instrumentation.cache_lookup(value is not None)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = build()
+        self.evictions += self.backend.set(key, value)
+        return value
+
+    def invalidate(self, version):
+        self.backend.invalidate(version)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self.backend)}
+
+
+def make_key(namespace, store, indicator, countries, year_range, breakdown=None):
+    """Kunci cache dari input callback yang dinormalisasi.
+
+    Negara diurutkan dan diduplikasi, rentang tahun dipotong ke tahun yang ada di
+    data, dan versi store diawalkan agar figure dari data lama tidak pernah dipakai.
+    `breakdown` (tuple kode, lihat data_index) sebaiknya sudah di-resolve ke seri yang ada.
+    """
+    countries = sorted(set(countries or []))
+    y0, y1 = year_range or store.year_bounds or (0, 0)
+    y0, y1 = int(y0), int(y1)
+    if store.year_bounds is not None:
+        lo, hi = store.year_bounds
+        y0, y1 = max(y0, lo), min(y1, hi)
+    key = f"{store.version}|{namespace}|{indicator}|{','.join(countries)}|{y0}-{y1}"
+    return key if breakdown is None else f"{key}|{'.'.join(breakdown)}"
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Cache bersama proses ini, dibuat sesuai FIGURE_CACHE_BACKEND saat pertama dipakai."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            if FIGURE_CACHE_BACKEND == "sqlite":
+                backend = SQLiteBackend(FIGURE_CACHE_SIZE, FIGURE_CACHE_PATH)
+            else:
+                backend = MemoryBackend(FIGURE_CACHE_SIZE)
+            _cache = FigureCache(backend)
+            data_store.on_reload(lambda store: _cache.invalidate(store.version))
+        return _cache
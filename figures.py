@@ -0,0 +1,145 @@
+# figures.py
+#
+# Potongan figure untuk callback dasbor, dibangun sebagai dict biasa (bukan objek
+# go.Figure) supaya murah dibuat dan bisa dikirim utuh maupun sebagai Patch.
+#
+# Setiap figure dibagi dua:
+#   - "shell": layout, template, colorscale dan geometri peta; hanya bergantung
+#     pada indikator dan dikirim sekali saat indikator berubah.
+#   - "traces": data yang bergantung pada pilihan negara/tahun; hanya bagian ini
+#     yang dikirim ulang saat slider atau pilihan negara berubah.
+#
+# Grafik tren dengan rentang tahun panjang / banyak negara memakai WebGL
+# (scattergl) di atas WEBGL_POINTS titik, agar render tetap lancar.
+
+import os
+
+import plotly.colors
+import plotly.io as pio
+
+COLORWAY = plotly.colors.qualitative.Plotly
+# Di atas total titik ini grafik tren memakai scattergl (tanpa marker) agar tetap lancar
+WEBGL_POINTS = int(os.environ.get("WEBGL_POINTS", 1000))
+_template = None
+
+
+def template():
+    """Template default Plotly (sama dengan yang dipakai plotly.express) sebagai dict."""
+    global _template
+    if _template is None:
+        _template = pio.templates[pio.templates.default].to_plotly_json()
+    return _template
+
+
+def country_colors(countries):
+    """Warna tetap per negara, sama di grafik garis, batang dan legenda."""
+    return {c: COLORWAY[i % len(COLORWAY)] for i, c in enumerate(sorted(countries))}
+
+
+def annotations(message):
+    if not message:
+        return []
+    return [{'text': message, 'xref': 'paper', 'yref': 'paper', 'showarrow': False, 'font': {'size': 16}}]
+
+
+def figure(shell, data, message=None, **layout):
+    """Menggabungkan shell dengan trace pilihan tanpa mengubah shell yang di-cache."""
+    return {
+        'data': data,
+        'layout': {**shell['layout'], **layout, 'annotations': annotations(message)},
+    }
+
+
+# --- Shell ---
+
+def line_shell(title, legend_title='Country', **layout):
+    # uirevision: zoom pengguna dipertahankan saat trace di-Patch (mis. negara berubah),
+    # dan di-reset saat indikator (judul) berubah
+    return {'data': [], 'layout': {
+        'template': template(), 'title': {'text': title}, 'uirevision': title,
+        'xaxis': {'title': {'text': 'Year'}}, 'yaxis': {'title': {'text': 'Value'}},
+        'legend': {'title': {'text': legend_title}}, **layout,
+    }}
+
+
+def bar_shell(orientation='h', **layout):
+    if orientation == 'h':
+        # Kategori diurutkan menurut nilai di browser, jadi tidak perlu dikirim per pilihan.
+        # Kategori pertama ada di bawah, jadi 'ascending' menaruh batang terbesar di atas
+        axes = {'xaxis': {'title': {'text': 'Value'}},
+                'yaxis': {'title': {'text': ''}, 'categoryorder': 'total ascending'}}
+    else:
+        axes = {'xaxis': {'title': {'text': 'Country'}}, 'yaxis': {'title': {'text': 'Value'}}}
+    return {'data': [], 'layout': {'template': template(), 'barmode': 'relative', **axes, **layout}}
+
+
+def choropleth_shell(geojson_data, colorscale='Viridis', colorbar_title='Value', **layout):
+    """Figure peta dengan satu trace berisi geometri; pilihan hanya mengisi array-nya."""
+    trace = {
+        'type': 'choropleth', 'geojson': geojson_data, 'featureidkey': 'properties.ISO_A3',
+        'coloraxis': 'coloraxis', 'locations': [], 'z': [], 'hovertext': [], 'customdata': [],
+        'hovertemplate': '<b>%{hovertext}</b><br><br>Value=%{z:.2f}<br>Year=%{customdata[0]}<extra></extra>',
+    }
+    return {'data': [trace], 'layout': {
+        'template': template(),
+        'geo': {'fitbounds': 'locations', 'visible': False},
+        'coloraxis': {'colorscale': plotly.colors.get_colorscale(colorscale),
+                      'colorbar': {'title': {'text': colorbar_title}}},
+        **layout,
+    }}
+
+
+# --- Trace dari potongan data (hasil SliceIndex, terurut per negara lalu tahun) ---
+
+def values(series):
+    # Value disimpan sebagai float32; str() memberi representasi terpendeknya (78.6,
+    # bukan 78.5999984741211) sehingga hover dan JSON tetap rapi.
+    return [float(str(v)) for v in series.to_numpy()]
+
+
+def line_traces(rows, colors):
+    # Di atas WEBGL_POINTS titik: scattergl tanpa marker (lihat juga lineTraces di JS)
+    webgl = len(rows) > WEBGL_POINTS
+    trace_type, mode = ('scattergl', 'lines') if webgl else ('scatter', 'lines+markers')
+    traces = []
+    for country, group in rows.groupby('Country', observed=True, sort=False):
+        traces.append({
+            'type': trace_type, 'mode': mode, 'name': country, 'legendgroup': country,
+            'x': group['Year'].tolist(), 'y': values(group['Value']),
+            'line': {'color': colors[country]},
+            'hovertemplate': f'Country={country}<br>Year=%{{x}}<br>Value=%{{y}}<extra></extra>',
+        })
+    return traces
+
+
+# --- Trace dari ringkasan per negara (aggregates.Summary) ---
+
+def bar_traces(summaries, colors, orientation='h'):
+    traces = []
+    for s in summaries:
+        country, value = s.country, s.latest_value
+        bar = {'type': 'bar', 'name': country, 'legendgroup': country, 'orientation': orientation,
+               'marker': {'color': colors[country]}}
+        if orientation == 'h':
+            bar.update(x=[value], y=[country], hovertemplate='Country=%{y}<br>Value=%{x}<extra></extra>')
+        else:
+            bar.update(x=[country], y=[value], hovertemplate='Country=%{x}<br>Value=%{y}<extra></extra>')
+        traces.append(bar)
+    return traces
+
+
+def choropleth_arrays(summaries=()):
+    return {
+        'locations': [s.iso for s in summaries],
+        'z': [s.latest_value for s in summaries],
+        'hovertext': [s.country for s in summaries],
+        'customdata': [[s.latest_year] for s in summaries],
+    }
+
+
+def metrics(summaries):
+    """Rata-rata dan nilai tertinggi pilihan, dari jumlah/banyak/max per seri."""
+    total = sum(s.sum for s in summaries)
+    count = sum(s.count for s in summaries)
+    best = max(summaries, key=lambda s: s.max)
+    return {'avg': total / count, 'max': best.max, 'max_country': best.country, 'max_year': best.max_year}
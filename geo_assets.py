@@ -0,0 +1,125 @@
+# geo_assets.py
+#
+# Pipeline GeoJSON untuk choropleth: dari file negara dunia, ambil hanya fitur
+# Pasifik yang benar-benar digambar, sederhanakan geometrinya, bulatkan koordinat,
+# lalu simpan hasilnya di samping file sumber sebagai cache.
+
+import json
+import os
+
+import numpy as np
+
+# Toleransi Douglas-Peucker dalam derajat (0 = tanpa penyederhanaan), dan jumlah
+# digit desimal koordinat (kosong/"none" = tanpa kuantisasi). 0.01° kira-kira 1 km.
+GEOJSON_SIMPLIFY_TOLERANCE = float(os.environ.get("GEOJSON_SIMPLIFY_TOLERANCE", 0.01))
+_digits = os.environ.get("GEOJSON_QUANTIZE_DIGITS", "3")
+GEOJSON_QUANTIZE_DIGITS = None if _digits.lower() in ("", "none") else int(_digits)
+
+ID_PROPERTY = "ISO_A3"
+# Properti lain dibuang; hover memakai kolom DataFrame, bukan properti GeoJSON
+KEEP_PROPERTIES = (ID_PROPERTY, "ADMIN", "NAME")
+
+
+def cache_suffix(tolerance=GEOJSON_SIMPLIFY_TOLERANCE, digits=GEOJSON_QUANTIZE_DIGITS):
+    return f"pacific.t{tolerance:g}.q{'none' if digits is None else digits}"
+
+
+def cache_path(source, tolerance=GEOJSON_SIMPLIFY_TOLERANCE, digits=GEOJSON_QUANTIZE_DIGITS):
+    root, ext = os.path.splitext(source)
+    return f"{root}.{cache_suffix(tolerance, digits)}{ext}"
+
+
+def prepare_geojson(source, codes, tolerance=GEOJSON_SIMPLIFY_TOLERANCE, digits=GEOJSON_QUANTIZE_DIGITS):
+    """Mengembalikan GeoJSON Pasifik yang sudah diproses, memakai cache jika masih baru.
+
+    `codes` adalah kumpulan kode ISO-3 yang dipertahankan. Cache dibangun ulang bila
+    file sumber lebih baru darinya; parameter ikut menjadi bagian nama file cache.
+    """
+    target = cache_path(source, tolerance, digits)
+    try:
+        if os.stat(target).st_mtime_ns >= os.stat(source).st_mtime_ns:
+            with open(target) as f:
+                cached = json.load(f)
+            # Daftar negara bisa berubah tanpa mengubah file sumber
+            if cached.get("codes") == sorted(codes):
+                return cached
+    except (OSError, ValueError):
+        pass
+
+    with open(source) as f:
+        world = json.load(f)
+    result = build_pacific_geojson(world, codes, tolerance, digits)
+
+    tmp = f"{target}.tmp-{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(result, f, separators=(",", ":"))
+    os.replace(tmp, target)
+    return result
+
+
+def build_pacific_geojson(world, codes, tolerance=GEOJSON_SIMPLIFY_TOLERANCE, digits=GEOJSON_QUANTIZE_DIGITS):
+    codes = set(codes)
+    features = []
+    for feat in world.get("features", []):
+        props = feat.get("properties") or {}
+        geom = feat.get("geometry")
+        if props.get(ID_PROPERTY) not in codes or not geom:
+            continue
+        if geom["type"] == "Polygon":
+            polygons = [geom["coordinates"]]
+        elif geom["type"] == "MultiPolygon":
+            polygons = geom["coordinates"]
+        else:
+            continue
+        polygons = [[_process_ring(ring, tolerance, digits) for ring in poly] for poly in polygons]
+        features.append({
+            "type": "Feature",
+            "id": props[ID_PROPERTY],
+            "properties": {k: props[k] for k in KEEP_PROPERTIES if k in props},
+            "geometry": {"type": "MultiPolygon", "coordinates": polygons},
+        })
+    return {"type": "FeatureCollection", "codes": sorted(codes), "features": features}
+
+
+def _process_ring(ring, tolerance, digits):
+    pts = np.asarray(ring, dtype=float)[:, :2]
+    # Antimeridian: semua wilayah yang digambar berada di timur 120°BT, jadi bujur
+    # negatif digeser ke [180, 360). Cincin yang melintasi ±180 (Fiji, Kiribati,
+    # Tuvalu) menjadi bersambung dan fitbounds tidak membentang ke seluruh dunia.
+    pts[:, 0] = np.where(pts[:, 0] < 0, pts[:, 0] + 360, pts[:, 0])
+    if tolerance > 0 and len(pts) > 4:
+        keep = _douglas_peucker(pts, tolerance)
+        if keep.sum() >= 4:
+            pts = pts[keep]
+        else:
+            # Pulau kecil: pertahankan segitiga minimal agar tetap terlihat di peta
+            pts = pts[np.unique(np.linspace(0, len(pts) - 1, 4).astype(int))]
+    if digits is not None:
+        pts = np.round(pts, digits)
+    return pts.tolist()
+
+
+def _douglas_peucker(pts, tolerance):
+    """Mask titik yang dipertahankan oleh penyederhanaan Douglas-Peucker (iteratif)."""
+    keep = np.zeros(len(pts), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(pts) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        seg = pts[end] - pts[start]
+        rel = pts[start + 1:end] - pts[start]
+        seg_len = np.hypot(seg[0], seg[1])
+        if seg_len == 0:
+            # Cincin tertutup: titik awal = titik akhir, pakai jarak ke titik tersebut
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / seg_len
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return keep
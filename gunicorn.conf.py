@@ -0,0 +1,43 @@
+# gunicorn.conf.py
+# Dibaca otomatis oleh `gunicorn app:server` dari direktori ini.
+
+import os
+import threading
+import time
+
+import data_store
+import hot_reload
+
+wsgi_app = "app:server"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+# Impor aplikasi sekali di master, lalu fork ke worker
+preload_app = True
+# 1 = data dimuat di master sebelum fork (dibagi copy-on-write); 0 = setiap worker
+# langsung menerima request dan memuat datanya sendiri di thread latar
+PRELOAD_DATA = os.environ.get("PRELOAD_DATA", "1") != "0"
+
+_boot_started = time.perf_counter()
+
+
+def on_starting(server):
+    if PRELOAD_DATA:
+        data_store.preload()
+
+
+def when_ready(server):
+    server.log.info("master siap dalam %.3fs", time.perf_counter() - _boot_started)
+
+
+def _warm_up(worker):
+    # Request yang datang lebih dulu menunggu pemuatan ini di data_store
+    store = data_store.current()
+    worker.log.info("%s", store.report())
+
+
+def post_worker_init(worker):
+    if PRELOAD_DATA:
+        worker.log.info("%s", data_store.current().report())
+    else:
+        threading.Thread(target=_warm_up, args=(worker,), name="data-warm-up", daemon=True).start()
+    # Setiap worker memantau file data sendiri dan menukar store-nya tanpa restart
+    hot_reload.start_watcher()
@@ -0,0 +1,133 @@
+# hot_reload.py
+#
+# Memuat ulang data tanpa me-restart worker gunicorn. Dua pemicu:
+#   - watcher: thread per worker yang memeriksa stat file data (ekspor SDMX,
+#     GeoJSON) setiap RELOAD_INTERVAL detik;
+#   - endpoint admin `POST /admin/reload` (header X-Admin-Token = ADMIN_TOKEN,
+#     `?full=1` untuk membangun ulang penuh). Endpoint menyentuh RELOAD_TRIGGER
+#     sehingga watcher di semua worker ikut memuat ulang, bukan hanya worker
+#     yang kebetulan menerima request.
+#
+# Store baru dibangun di thread latar; request yang sedang berjalan tetap memakai
+# store lama sampai selesai (lihat data_store.reload).
+
+import hmac
+import os
+import threading
+import time
+
+import data_loader
+import data_store
+
+# Detik antar pemeriksaan file data; 0 = watcher tidak dijalankan
+RELOAD_INTERVAL = float(os.environ.get("RELOAD_INTERVAL", 30))
+# File sedang disalin? tunggu sampai stat-nya stabil selama sekian detik
+RELOAD_SETTLE = float(os.environ.get("RELOAD_SETTLE", 1))
+# Kosong = endpoint admin dinonaktifkan
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+RELOAD_TRIGGER = os.environ.get("RELOAD_TRIGGER", os.path.join(data_loader.BASE_DIR, ".cache", "reload"))
+
+_watcher = None
+
+
+def snapshot():
+    """{path: (ukuran, mtime)} untuk semua file yang menentukan isi store, plus file pemicu."""
+    stats = {}
+    for path in data_loader.source_paths() + [data_loader.GEOJSON_PATH, RELOAD_TRIGGER]:
+        try:
+            st = os.stat(path)
+            stats[path] = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            stats[path] = None
+    return stats
+
+
+def reload_now(full=False):
+    """Memuat ulang di thread pemanggil; kegagalan dicatat dan store lama tetap dipakai."""
+    try:
+        return data_store.reload(full)
+    except Exception as e:
+        print(f"[hot_reload] reload gagal, store lama tetap dipakai: {e}")
+        return None
+
+
+def reload_in_background(full=False):
+    thread = threading.Thread(target=reload_now, args=(full,), name="data-reload", daemon=True)
+    thread.start()
+    return thread
+
+
+def _trigger_wants_full():
+    try:
+        with open(RELOAD_TRIGGER) as f:
+            return f.readline().strip() == "full"
+    except OSError:
+        return False
+
+
+class Watcher(threading.Thread):
+    """Thread yang memuat ulang data saat file data atau RELOAD_TRIGGER berubah."""
+
+    def __init__(self, interval=RELOAD_INTERVAL):
+        super().__init__(name="data-watcher", daemon=True)
+        self.interval = interval
+        self._halt = threading.Event()
+        self._last = snapshot()
+
+    def run(self):
+        while not self._halt.wait(self.interval):
+            stats = snapshot()
+            if stats == self._last:
+                continue
+            # Tunggu sampai file selesai ditulis sebelum membaca
+            while not self._halt.wait(RELOAD_SETTLE):
+                settled = snapshot()
+                if settled == stats:
+                    break
+                stats = settled
+            full = stats.get(RELOAD_TRIGGER) != self._last.get(RELOAD_TRIGGER) and _trigger_wants_full()
+            self._last = stats
+            reload_now(full)
+
+    def stop(self):
+        self._halt.set()
+
+
+def start_watcher(interval=RELOAD_INTERVAL):
+    """Menjalankan watcher untuk proses ini (sekali per proses; panggil di worker, bukan master)."""
+    global _watcher
+    if interval <= 0:
+        return None
+    # Thread tidak ikut ter-fork: watcher dari master tidak berjalan di worker
+    if _watcher is None or not _watcher.is_alive():
+        _watcher = Watcher(interval)
+        _watcher.start()
+    return _watcher
+
+
+def request_reload(full=False):
+    """Meminta semua worker memuat ulang lewat RELOAD_TRIGGER.
+
+    Jika watcher tidak berjalan di proses ini, proses ini langsung memuat ulang di latar.
+    """
+    os.makedirs(os.path.dirname(RELOAD_TRIGGER), exist_ok=True)
+    tmp = f"{RELOAD_TRIGGER}.tmp-{os.getpid()}"
+    with open(tmp, "w") as f:
+        f.write(f"{'full' if full else 'refresh'}\n{time.time()}\n")
+    os.replace(tmp, RELOAD_TRIGGER)
+    if _watcher is None or not _watcher.is_alive():
+        reload_in_background(full)
+
+
+def register_endpoint(server):
+    """Mendaftarkan POST /admin/reload pada server Flask aplikasi."""
+    from flask import abort, jsonify, request
+
+    @server.route("/admin/reload", methods=["POST"])
+    def admin_reload():
+        if not ADMIN_TOKEN:
+            abort(404)
+        if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN):
+            abort(403)
+        request_reload(full=request.args.get("full") == "1")
+        return jsonify(status="accepted", version=data_store.current().version), 202
@@ -0,0 +1,176 @@
+# http_delivery.py
+#
+# Pengiriman HTTP yang hemat untuk pengguna di jaringan satelit:
+#   - kompresi gzip (atau brotli jika paket `brotli` terpasang) untuk respons teks/JSON
+#     yang lebih besar dari COMPRESS_MIN_BYTES, termasuk respons callback Dash;
+#   - ETag + Cache-Control untuk respons GET yang deterministik (halaman, layout,
+#     dependensi callback, aset, figure naratif), sehingga kunjungan berikutnya
+#     cukup dijawab 304 tanpa body.
+# Ukuran yang benar-benar dikirim dicatat di instrumentation.TRANSFER_BYTES.
+
+import gzip
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import instrumentation
+
+try:
+    import brotli
+except ImportError:  # opsional; tanpa brotli hanya gzip yang dipakai
+    brotli = None
+
+# 0 = respons dikirim apa adanya
+COMPRESS = os.environ.get("COMPRESS", "1") != "0"
+# Respons yang lebih kecil dari ini muat di satu paket; kompresi tidak sepadan
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", 1024))
+COMPRESS_LEVEL = int(os.environ.get("COMPRESS_LEVEL", 6))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", 5))
+# Jumlah body terkompresi (respons ber-ETag, mis. plotly.js) yang disimpan agar tidak dikompresi ulang
+COMPRESS_CACHE_SIZE = int(os.environ.get("COMPRESS_CACHE_SIZE", 32))
+# Aset dengan sidik ?m=<mtime> di URL (ditambahkan Dash) boleh disimpan browser selama ini
+ASSET_MAX_AGE = int(os.environ.get("ASSET_MAX_AGE", 31536000))
+
+COMPRESSIBLE = {
+    "application/json", "application/javascript", "application/geo+json", "image/svg+xml",
+    "text/html", "text/css", "text/javascript", "text/plain",
+}
+
+_compressed = OrderedDict()
+_compressed_lock = threading.Lock()
+
+
+def route_kind(path):
+    """Kelompok path untuk label metrik transfer."""
+    if path.endswith("/_dash-update-component"):
+        return "callback"
+    if path.endswith(("/_dash-layout", "/_dash-dependencies")):
+        return "layout"
+    if "/_dash-component-suites/" in path:
+        return "component"
+    if "/assets/" in path:
+        return "asset"
+    if "/narrative/figures/" in path:
+        return "narrative"
+    return "page"
+
+
+def choose_encoding(accept_encodings):
+    if brotli is not None and accept_encodings["br"]:
+        return "br"
+    if accept_encodings["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESS_LEVEL, mtime=0)
+
+
+def _cached_body(etag, encoding):
+    with _compressed_lock:
+        body = _compressed.get((etag, encoding))
+        if body is not None:
+            _compressed.move_to_end((etag, encoding))
+        return body
+
+
+def _store_body(etag, encoding, body):
+    # Body ber-ETag tidak berubah selama ETag-nya sama
+    with _compressed_lock:
+        _compressed[(etag, encoding)] = body
+        while len(_compressed) > COMPRESS_CACHE_SIZE:
+            _compressed.popitem(last=False)
+
+
+def _etag_matches(if_none_match, etag):
+    # Varian terkompresi memakai ETag "<tag>-gzip" / "<tag>-br"; semuanya mewakili isi yang sama
+    return any(if_none_match.contains_weak(tag) for tag in (etag, f"{etag}-gzip", f"{etag}-br"))
+
+
+def set_cache_headers(response, request):
+    """ETag dan Cache-Control untuk respons GET; mengembalikan ETag (tanpa akhiran encoding) atau None."""
+    if request.method not in ("GET", "HEAD") or response.status_code != 200:
+        return None
+    etag, _ = response.get_etag()
+    if etag is None:
+        if response.direct_passthrough or response.is_streamed:
+            return None
+        response.add_etag()
+        etag, _ = response.get_etag()
+    cache_control = response.cache_control
+    if "/assets/" in request.path and request.args.get("m"):
+        cache_control.no_cache = None
+        cache_control.public = True
+        cache_control.max_age = ASSET_MAX_AGE
+    elif cache_control.max_age is None and not cache_control.no_store:
+        # Boleh disimpan, tetapi selalu divalidasi ulang dengan ETag (304 jika tidak berubah)
+        cache_control.no_cache = True
+    return etag
+
+
+def init_app(app):
+    """Memasang kompresi dan header cache pada server Flask aplikasi Dash.
+
+    Panggil sebelum instrumentation.init_app agar metrik payload di sana tetap
+    mencatat ukuran sebelum kompresi.
+    """
+    from flask import request
+
+    server = app.server
+
+    @server.after_request
+    def _deliver(response):
+        start = time.perf_counter()
+        etag = set_cache_headers(response, request)
+        compressible = COMPRESS and response.mimetype in COMPRESSIBLE
+        if compressible:
+            response.vary.add("Accept-Encoding")
+        if etag is not None and _etag_matches(request.if_none_match, etag):
+            not_modified = server.response_class(status=304)
+            for header in ("ETag", "Cache-Control", "Vary"):
+                if header in response.headers:
+                    not_modified.headers[header] = response.headers[header]
+            response.close()
+            instrumentation.TRANSFER_BYTES.observe(0, route=route_kind(request.path), encoding="304")
+            return not_modified
+
+        encoding = None
+        if (compressible and response.status_code == 200 and "Content-Encoding" not in response.headers
+                and request.method != "HEAD"):
+            encoding = choose_encoding(request.accept_encodings)
+        if encoding is not None:
+            body = _cached_body(etag, encoding) if etag else None
+            if body is not None:
+                # Stream file statis yang tidak jadi dibaca harus ditutup
+                if hasattr(response.response, "close"):
+                    response.response.close()
+            else:
+                # File statis dikirim sebagai stream; dibaca agar bisa dikompresi
+                response.direct_passthrough = False
+                data = response.get_data()
+                if len(data) >= COMPRESS_MIN_BYTES:
+                    body = compress(data, encoding)
+                    if etag:
+                        _store_body(etag, encoding, body)
+            if body is not None:
+                response.set_data(body)
+                response.headers["Content-Encoding"] = encoding
+                if etag:
+                    response.set_etag(f"{etag}-{encoding}")
+                timing = response.headers.get("Server-Timing")
+                if timing:
+                    elapsed = (time.perf_counter() - start) * 1000
+                    response.headers["Server-Timing"] = f"{timing}, compress;dur={elapsed:.2f}"
+            else:
+                encoding = None
+
+        size = response.content_length
+        if size is None and not response.direct_passthrough and not response.is_streamed:
+            size = len(response.get_data())
+        if size is not None:
+            instrumentation.TRANSFER_BYTES.observe(size, route=route_kind(request.path), encoding=encoding or "identity")
+        return response
@@ -0,0 +1,122 @@
+# ingest.py
+#
+# Pipeline ingest untuk ekspor SDMX Blue Pacific 2050 (semua area tematik) di atas
+# data_loader: CSV dibaca per potongan lewat generator, dinormalisasi seperti
+# load_data (rename, konversi numerik, kode ISO), diduplikasi pada kunci seri +
+# tahun, lalu digabung ke store.
+#
+# Memori yang dipakai sebanding dengan tabel hasil (kolom kategori + int16/float32),
+# bukan dengan ukuran CSV mentah: hanya satu potongan mentah yang dibaca sekaligus.
+#
+#   python ingest.py                 # ingest penuh semua sumber (data_loader.source_paths)
+#   python ingest.py a.csv b.csv     # ingest file tertentu
+
+import copy
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+from data_index import SERIES_COLUMNS, SORT_COLUMNS
+
+# Potongan bersih dipadatkan (digabung + deduplikasi) setiap kali sebanyak ini baris terkumpul
+COMPACT_ROWS = int(os.environ.get("INGEST_COMPACT_ROWS", 1000000))
+
+
+def iter_observations(paths=None, chunksize=None, labels=None):
+    """Generator potongan observasi bersih dari file sumber, berurutan per file.
+
+    Label kode dari setiap potongan digabung ke `labels` jika diberikan.
+    """
+    for path in data_loader.source_paths() if paths is None else paths:
+        for chunk, chunk_labels in data_loader.read_chunks(path, chunksize):
+            if labels is not None:
+                data_loader.merge_labels(labels, chunk_labels)
+            yield chunk
+
+
+def ingest(paths=None, chunksize=None):
+    """Ingest penuh: (df, labels) dari semua file sumber.
+
+    Jika observasi yang sama muncul lebih dari sekali, yang datang terakhir (file
+    berikutnya dalam urutan source_paths) yang disimpan.
+    """
+    labels, parts, pending = {}, [], 0
+    for chunk in iter_observations(paths, chunksize, labels):
+        parts.append(chunk)
+        pending += len(chunk)
+        if pending >= COMPACT_ROWS:
+            parts, pending = [data_loader.combine_observations(parts)], 0
+    return data_loader.combine_observations(parts), labels
+
+
+def _value_lookup(df):
+    # Kunci observasi -> nilai, untuk membandingkan potongan baru dengan isi store
+    return pd.Series(df['Value'].to_numpy(), index=pd.MultiIndex.from_frame(df[SORT_COLUMNS]))
+
+
+def changed_rows(lookup, chunk):
+    """Baris `chunk` yang belum ada di store atau nilainya berbeda (revisi)."""
+    if chunk.empty or lookup.empty:
+        return chunk
+    old = lookup.reindex(pd.MultiIndex.from_frame(chunk[SORT_COLUMNS])).to_numpy()
+    return chunk[np.isnan(old) | (old != chunk['Value'].to_numpy())]
+
+
+def refresh(store, paths=None, chunksize=None):
+    """Refresh inkremental: DataStore baru berisi observasi baru/berubah, atau None.
+
+    Hanya file sumber yang ukuran/mtime-nya berubah sejak store dimuat (dan file
+    sesudahnya) yang dibaca ulang, dan dari situ hanya observasi baru atau yang
+    nilainya berubah yang diproses lebih lanjut; ringkasan di SummaryCube dihitung
+    ulang hanya untuk seri yang tersentuh. Observasi yang hilang dari file sumber
+    tidak dihapus; untuk itu muat ulang penuh.
+    """
+    from data_store import DataStore
+
+    start = time.perf_counter()
+    stats = data_loader.source_stats(paths)
+    order = list(stats)
+    changed = [i for i, path in enumerate(order) if store.sources.get(path) != stats[path]]
+    if not changed:
+        return None
+    # File sesudah file pertama yang berubah ikut dibaca agar urutan "terakhir menang" tetap berlaku
+    reread = order[changed[0]:]
+
+    labels = {col: dict(mapping) for col, mapping in store.labels.items()}
+    fresh, new_labels = ingest(reread, chunksize)
+    data_loader.merge_labels(labels, new_labels)
+    changes = changed_rows(_value_lookup(store.df), fresh)
+    del fresh
+    sources = {**store.sources, **stats}
+    if changes.empty:
+        # File disentuh tetapi isinya sama: cukup catat statnya
+        store.sources = sources
+        return None
+
+    df = data_loader.combine_observations([store.df, changes])
+    new = DataStore(df, store.geojson_data, time.perf_counter() - start, labels,
+                    data_loader.data_version(), cube=copy.copy(store.cube), sources=sources)
+    touched = changes[SERIES_COLUMNS].drop_duplicates()
+    positions = [new.index.positions(indicator, [country], None, tuple(breakdown))
+                 for indicator, country, *breakdown in touched.itertuples(index=False)]
+    new.cube.update(new.df.iloc[np.concatenate(positions)])
+    print(f"[ingest] {len(changed)} file berubah, {len(changes)} observasi baru/direvisi, "
+          f"{len(touched)} seri dihitung ulang ({new.load_seconds:.3f}s)")
+    return new
+
+
+if __name__ == '__main__':
+    import data_store
+
+    paths = sys.argv[1:] or None
+    start = time.perf_counter()
+    df, labels = ingest(paths)
+    elapsed = time.perf_counter() - start
+    rss, _ = data_store.process_memory_mb()
+    series = len(df[SERIES_COLUMNS].drop_duplicates()) if not df.empty else 0
+    print(f"{len(paths or data_loader.source_paths())} file, {len(df)} observasi, {series} seri, "
+          f"{df.memory_usage(deep=True).sum() / 1024 ** 2:.2f} MB tabel, {elapsed:.2f}s, rss {rss:.1f} MB")
@@ -0,0 +1,284 @@
+# instrumentation.py
+#
+# Pengukuran latensi untuk callback Dash dan jalur pemuatan data.
+#
+# Kode yang diukur cukup membungkus bagiannya dengan `with instrumentation.stage("filter")`.
+# Selama request, durasi tiap tahap dikumpulkan per request lalu:
+#   - dikirim ke browser sebagai header Server-Timing (terlihat di DevTools > Network),
+#   - dicatat sebagai histogram Prometheus di endpoint METRICS_PATH (default /metrics).
+# Tahap "callback" (fungsi callback itu sendiri), "serialize" (Dash mengubah hasil ke
+# JSON) dan "total" diukur otomatis oleh init_app(); ukuran payload dan hit/miss
+# figure_cache juga. Callback yang "total"-nya melewati LATENCY_BUDGET_MS dihitung
+# per callback, sehingga interaksi yang lambat langsung terlihat di /metrics.
+#
+# Metrik disimpan per proses: dengan beberapa worker gunicorn, setiap scrape melihat
+# worker yang kebetulan melayaninya.
+
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# 0 = tidak memasang hook sama sekali
+INSTRUMENTATION = os.environ.get("INSTRUMENTATION", "1") != "0"
+METRICS_PATH = os.environ.get("METRICS_PATH", "/metrics")
+# 0 = header Server-Timing tidak dikirim (metrik tetap dicatat)
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "1") != "0"
+# Callback yang lebih lambat dari ini dihitung di blue_pacific_callback_over_budget_total
+LATENCY_BUDGET_MS = float(os.environ.get("LATENCY_BUDGET_MS", 300))
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_local = threading.local()
+
+
+# --- Metrik bergaya Prometheus ---
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name, self.help, self.kind = name, help_text, "counter"
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[tuple(sorted(labels.items()))] = value
+
+    def render(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(dict(key))} {value}" for key, value in items]
+
+
+class Gauge(Counter):
+    def __init__(self, name, help_text):
+        super().__init__(name, help_text)
+        self.kind = "gauge"
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name, self.help, self.kind = name, help_text, "histogram"
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counts, total, count = self._series.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._series[key] = (counts, total + value, count + 1)
+
+    def render(self):
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        lines = []
+        for key, counts, total, count in items:
+            labels = dict(key)
+            for bound, n in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_labels({**labels, 'le': repr(float(bound))})} {n}")
+            lines.append(f"{self.name}_bucket{_labels({**labels, 'le': '+Inf'})} {count}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(labels)} {count}")
+        return lines
+
+
+STAGE_SECONDS = Histogram("blue_pacific_stage_seconds",
+                          "Durasi per tahap request (filter, aggregate, figure, callback, serialize, total).",
+                          SECONDS_BUCKETS)
+PAYLOAD_BYTES = Histogram("blue_pacific_response_bytes", "Ukuran body respons sebelum kompresi.", BYTES_BUCKETS)
+TRANSFER_BYTES = Histogram("blue_pacific_transfer_bytes",
+                           "Ukuran body yang dikirim ke klien per jenis route dan encoding (lihat http_delivery).",
+                           BYTES_BUCKETS)
+CACHE_LOOKUPS = Counter("blue_pacific_figure_cache_lookups_total", "Pencarian figure_cache per callback.")
+OVER_BUDGET = Counter("blue_pacific_callback_over_budget_total",
+                      "Request callback yang melewati LATENCY_BUDGET_MS.")
+LOAD_SECONDS = Gauge("blue_pacific_data_load_seconds", "Durasi per tahap pemuatan data terakhir.")
+CACHE_ENTRIES = Gauge("blue_pacific_figure_cache_entries", "Jumlah entri figure_cache saat ini.")
+METRICS = [STAGE_SECONDS, PAYLOAD_BYTES, TRANSFER_BYTES, CACHE_LOOKUPS, OVER_BUDGET, LOAD_SECONDS, CACHE_ENTRIES]
+
+
+def render_metrics():
+    """Semua metrik dalam format teks eksposisi Prometheus."""
+    import figure_cache
+
+    if figure_cache._cache is not None:
+        CACHE_ENTRIES.set(figure_cache._cache.stats()["size"])
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- Pengumpulan per request / per pemuatan ---
+
+@contextmanager
+def collect():
+    """Mengumpulkan durasi stage() di thread ini ke dict {tahap: detik} yang di-yield."""
+    previous = getattr(_local, "timings", None)
+    _local.timings = timings = {}
+    try:
+        yield timings
+    finally:
+        _local.timings = previous
+
+
+@contextmanager
+def stage(name):
+    """Mengukur satu tahap; tanpa collect() yang aktif, pengukuran diabaikan."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def record(name, seconds):
+    timings = getattr(_local, "timings", None)
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+def cache_lookup(hit):
+    """Dipanggil figure_cache untuk setiap get_or_build."""
+    counts = getattr(_local, "cache", None)
+    if counts is not None:
+        counts["hit" if hit else "miss"] += 1
+
+
+def record_load(timings, total):
+    """Mencatat tahap pemuatan data (lihat data_store._build) sebagai gauge."""
+    for name, seconds in timings.items():
+        LOAD_SECONDS.set(round(seconds, 6), stage=name)
+    LOAD_SECONDS.set(round(total, 6), stage="total")
+
+
+def server_timing(timings):
+    """Nilai header Server-Timing dari {tahap: detik}."""
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items())
+
+
+# --- Integrasi Dash / Flask ---
+
+def _callback_label(body):
+    # "..time-series-plot.figure...map-plot.figure.." -> "time-series-plot"
+    output = (body or {}).get("output", "")
+    first = output.strip(".").split("...")[0]
+    return first.rsplit(".", 1)[0] or "unknown"
+
+
+def _wrap(func):
+    if getattr(func, "_instrumented", False):
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        timings = getattr(_local, "timings", None)
+        serialized = timings.get("serialize", 0.0) if timings is not None else 0.0
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            if timings is not None:
+                # to_json dipanggil di dalam pembungkus Dash; waktunya dilaporkan terpisah
+                elapsed -= timings.get("serialize", 0.0) - serialized
+            record("callback", elapsed)
+
+    wrapper._instrumented = True
+    return wrapper
+
+
+def _timed_to_json(to_json):
+    if getattr(to_json, "_instrumented", False):
+        return to_json
+
+    @functools.wraps(to_json)
+    def timed(*args, **kwargs):
+        with stage("serialize"):
+            return to_json(*args, **kwargs)
+
+    timed._instrumented = True
+    return timed
+
+
+def init_app(app):
+    """Memasang pengukuran pada aplikasi Dash: callback, header Server-Timing dan METRICS_PATH."""
+    if not INSTRUMENTATION:
+        return
+    from dash import _callback
+    from flask import Response, request
+
+    server = app.server
+    # Dash menyerialisasi keluaran callback lewat _callback.to_json
+    _callback.to_json = _timed_to_json(_callback.to_json)
+
+    def wrap_callbacks():
+        # Callback dari dash.callback baru dipindah ke app.callback_map saat request pertama
+        for entry in app.callback_map.values():
+            if "callback" in entry:
+                entry["callback"] = _wrap(entry["callback"])
+
+    @server.before_request
+    def _start_timing():
+        wrap_callbacks()
+        _local.start = time.perf_counter()
+        _local.timings = {}
+        _local.cache = {"hit": 0, "miss": 0}
+
+    @server.after_request
+    def _finish_timing(response):
+        start = getattr(_local, "start", None)
+        timings = getattr(_local, "timings", None)
+        if start is None or timings is None:
+            return response
+        timings["total"] = time.perf_counter() - start
+
+        if request.path.endswith("/_dash-update-component"):
+            label = _callback_label(request.get_json(silent=True))
+            for name, seconds in timings.items():
+                STAGE_SECONDS.observe(seconds, callback=label, stage=name)
+            if not response.direct_passthrough:
+                PAYLOAD_BYTES.observe(len(response.get_data()), callback=label)
+            for result, n in _local.cache.items():
+                if n:
+                    CACHE_LOOKUPS.inc(n, callback=label, result=result)
+            if timings["total"] * 1000 > LATENCY_BUDGET_MS:
+                OVER_BUDGET.inc(callback=label)
+
+        if SERVER_TIMING:
+            header = server_timing(timings)
+            if any(_local.cache.values()):
+                header += f', cache;desc="hit={_local.cache["hit"]} miss={_local.cache["miss"]}"'
+            response.headers["Server-Timing"] = header
+        return response
+
+    @server.teardown_request
+    def _clear_timing(exc=None):
+        _local.start = _local.timings = _local.cache = None
+
+    @server.route(METRICS_PATH)
+    def metrics():
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
@@ -3,14 +3,22 @@
 from dash import html, dcc
 import dash_bootstrap_components as dbc
 
-def create_layout(data):
+def create_layout(data, client_data=None, cube=None, labels=None):
     """
     Membuat tata letak aplikasi Dash menggunakan data yang telah diproses.
+
+    `client_data` adalah payload dari callbacks.client_data(); jika diberikan, tabel
+    observasi ikut dikirim ke dcc.Store dan filter berjalan di browser.
+    `cube` (aggregates.SummaryCube) dan `labels` mengisi dropdown breakdown untuk
+    indikator awal; callback breakdown tidak dijalankan saat muat awal.
     """
     # Ambil nilai unik untuk filter dari dataframe
     unique_indicators = sorted(data['Indicator'].unique())
     unique_countries = sorted(data['Country'].unique())
     min_year, max_year = int(data['Year'].min()), int(data['Year'].max())
+    breakdown_options, breakdown = [], None
+    if cube is not None:
+        breakdown_options, breakdown = cube.breakdown_choice(unique_indicators[0], labels=labels)
 
     # Definisikan layout dengan dbc.Container untuk tata letak yang rapi
     return dbc.Container(fluid=True, children=[
@@ -39,7 +47,14 @@ def create_layout(data):
                                     options=[{'label': i, 'value': i} for i in unique_indicators],
                                     value=unique_indicators[0]
                                 )
-                            ], md=6, className="mb-3 mb-md-0"),
+                            ], md=4, className="mb-3 mb-md-0"),
+
+                            dbc.Col([
+                                html.Label("Select Breakdown", className="fw-bold"),
+                                # Opsi awal dari cube; callback mengisinya ulang saat indikator berubah
+                                dcc.Dropdown(id='breakdown-selector', options=breakdown_options,
+                                             value=breakdown, clearable=False)
+                            ], md=4, className="mb-3 mb-md-0"),
 
                             dbc.Col([
                                 html.Label("Select Countries", className="fw-bold"),
@@ -49,7 +64,7 @@ def create_layout(data):
                                     value=unique_countries[:4],  # Default 4 negara pertama
                                     multi=True
                                 )
-                            ], md=6),
+                            ], md=4),
                         ]),
                         html.Label("Select Year Range", className="fw-bold mt-4"),
                         dcc.RangeSlider(
@@ -79,6 +94,8 @@ def create_layout(data):
             dbc.Col(dcc.Graph(id='comparison-plot'), lg=5),
         ]),
 
+        dcc.Store(id='visuals-data', data=client_data),
+
         # Footer
         html.Footer(
             dbc.Row(
@@ -0,0 +1,184 @@
+# narrative_figures.py
+#
+# Langkah build untuk halaman cerita: figure dirender sekali ke JSON setiap kali
+# data berubah, lalu halaman hanya membaca file JSON tersebut.
+#
+#   python narrative_figures.py      # bangun ulang secara eksplisit (mis. saat deploy)
+
+import json
+import os
+
+from data_loader import BASE_DIR
+
+# Naikkan jika isi figure di build_figures() diubah
+NARRATIVE_VERSION = 3
+
+FIGURES_DIR = os.environ.get("NARRATIVE_FIGURES_DIR", os.path.join(BASE_DIR, ".cache", "narrative"))
+FIGURE_NAMES = ("map", "coverage", "price")
+
+# --- INDIKATOR UNTUK SETIAP "BAB" CERITA ---
+indikator_bab_1 = "IT_NET_BBND"
+indikator_bab_2 = "IT_MOB_4GNTWK"
+indikator_bab_3 = "BPI_PRU"
+
+
+def build_figures(store):
+    """Membangun figure peta, jangkauan dan harga dari store data; mengembalikan dict JSON-string."""
+    import numpy as np  # Kita butuh numpy untuk logaritma
+    import pandas as pd
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    def latest(indicator):
+        # Nilai terakhir per negara langsung dari tabel agregat (breakdown bawaan indikator)
+        breakdown = store.cube.default_breakdown(indicator)
+        summaries = store.cube.summarize(store.index, indicator, store.index.countries(indicator), None, breakdown)
+        return pd.DataFrame({
+            'Country': [s.country for s in summaries],
+            'iso_alpha': [s.iso for s in summaries],
+            'Year': [s.latest_year for s in summaries],
+            'Value': [s.latest_value for s in summaries],
+        })
+
+    df_map_latest = latest(indikator_bab_1)
+    df_coverage_latest = latest(indikator_bab_2)
+    df_price_latest = latest(indikator_bab_3)
+
+    if not df_map_latest.empty:
+        # Warna memakai logaritma dari 'Value' (+1 agar nilai 0 tidak error), hover tetap 'Value' asli
+        df_map_latest['LogValue'] = np.log10(df_map_latest['Value'] + 1)
+        fig_map = px.choropleth(df_map_latest, geojson=store.geojson_data, locations='iso_alpha',
+                               featureidkey="properties.ISO_A3",
+                               color='LogValue',
+                               color_continuous_scale="Blues",
+                               hover_name='Country',
+                               hover_data={'Value': ':.2f', 'Year': True, 'LogValue': False},
+                               labels={'LogValue': 'Value (Log Scale)'})
+        fig_map.update_layout(margin={"r":0, "t":0, "l":0, "b":0})
+    else:
+        fig_map = go.Figure().add_annotation(text="Data tidak tersedia untuk indikator ini", showarrow=False)
+
+    if not df_coverage_latest.empty:
+        fig_coverage = px.bar(df_coverage_latest.sort_values('Value', ascending=True), x='Value', y='Country', orientation='h', labels={'Value': '% Populasi Terjangkau Sinyal', 'Country': ''}, text='Value')
+        fig_coverage.update_traces(texttemplate='%{text:.2s}%', textposition='inside', marker_color='#0066cc')
+    else:
+        fig_coverage = go.Figure().add_annotation(text="Data tidak tersedia", showarrow=False)
+
+    if not df_price_latest.empty:
+        fig_price = px.bar(df_price_latest.sort_values('Value', ascending=False), x='Value', y='Country', orientation='h', labels={'Value': 'Harga Layanan (% GNI)', 'Country': ''}, text='Value')
+        fig_price.update_traces(texttemplate='%{text:.2f}%', textposition='auto', marker_color='#cc6600')
+    else:
+        fig_price = go.Figure().add_annotation(text="Data tidak tersedia", showarrow=False)
+
+    return {"map": fig_map.to_json(), "coverage": fig_coverage.to_json(), "price": fig_price.to_json()}
+
+
+def figures_key(store):
+    """Kunci figure untuk `store`; berubah bersama versi data dan NARRATIVE_VERSION."""
+    return f"{NARRATIVE_VERSION}-{store.version}"
+
+
+def write_figures(store=None):
+    """Merender figure dari data terbaru (atau `store`) dan menulisnya ke FIGURES_DIR."""
+    import data_store
+
+    if store is None:
+        store = data_store.current()
+    key = figures_key(store)
+    rendered = build_figures(store)
+
+    os.makedirs(FIGURES_DIR, exist_ok=True)
+    for name, payload in rendered.items():
+        tmp = os.path.join(FIGURES_DIR, f"{name}.json.tmp-{os.getpid()}")
+        with open(tmp, "w") as f:
+            f.write(payload)
+        os.replace(tmp, os.path.join(FIGURES_DIR, f"{name}.json"))
+    # Manifest ditulis terakhir: pembaca hanya mempercayai file jika kuncinya cocok
+    tmp = os.path.join(FIGURES_DIR, f"manifest.json.tmp-{os.getpid()}")
+    with open(tmp, "w") as f:
+        json.dump({"key": key}, f)
+    os.replace(tmp, os.path.join(FIGURES_DIR, "manifest.json"))
+    return key
+
+
+def load_figures(store):
+    """Figure naratif `store` sebagai dict siap pakai untuk dcc.Graph; dibangun ulang
+    jika file di FIGURES_DIR berasal dari versi data lain."""
+    key = figures_key(store)
+    try:
+        with open(os.path.join(FIGURES_DIR, "manifest.json")) as f:
+            fresh = json.load(f).get("key") == key
+    except (OSError, ValueError):
+        fresh = False
+    if not fresh:
+        write_figures(store)
+
+    figures = {}
+    for name in FIGURE_NAMES:
+        with open(os.path.join(FIGURES_DIR, f"{name}.json")) as f:
+            figures[name] = json.load(f)
+    return figures
+
+
+_loaded = (None, None)
+
+
+def current_figures():
+    """Figure untuk store yang aktif; dibaca dari disk hanya saat versi datanya berubah
+    (mis. setelah data_store.reload)."""
+    global _loaded
+    import data_store
+
+    store = data_store.current()
+    key, figures = _loaded
+    if key != store.version:
+        figures = load_figures(store)
+        _loaded = (store.version, figures)
+    return figures
+
+
+def figures_path(store=None):
+    """Path URL figure naratif untuk `store` atau store yang aktif (lihat register_endpoint)."""
+    if store is None:
+        import data_store
+        store = data_store.current()
+    return f"/narrative/figures/{figures_key(store)}.json"
+
+
+_payload = (None, None)
+
+
+def current_payload():
+    """(kunci, body JSON) ketiga figure untuk store yang aktif, diserialisasi sekali per versi."""
+    global _payload
+    import data_store
+
+    store = data_store.current()
+    key, body = _payload
+    if key != figures_key(store):
+        key = figures_key(store)
+        body = json.dumps(current_figures(), separators=(",", ":")).encode()
+        _payload = (key, body)
+    return key, body
+
+
+def register_endpoint(server):
+    """Mendaftarkan GET /narrative/figures/<kunci>.json pada server Flask aplikasi.
+
+    Kunci di URL ikut berubah saat data berubah, jadi respons untuk kunci yang
+    berlaku boleh disimpan browser tanpa batas waktu.
+    """
+    @server.route("/narrative/figures/<key>.json")
+    def narrative_figures_json(key):
+        current, body = current_payload()
+        response = server.response_class(body, mimetype="application/json")
+        response.set_etag(current)
+        if key == current:
+            response.cache_control.public = True
+            response.cache_control.max_age = 31536000
+            response.cache_control.immutable = True
+        return response
+
+
+if __name__ == '__main__':
+    print(f"Figure naratif ditulis ke {FIGURES_DIR} (kunci {write_figures()})")
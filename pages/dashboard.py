@@ -1,79 +1,160 @@
-from dash import dcc, html, Input, Output, callback
+import dash
+from dash import dcc, html, Input, Output, State, Patch, ClientsideFunction, callback, clientside_callback
 import dash_bootstrap_components as dbc
-import plotly.express as px
-import plotly.graph_objects as go
-from data_loader import load_data
+import clientside
+from callbacks import patch_only
+import data_store
+import figure_cache
+import figures
+import instrumentation
 
-# Muat data sekali
-df, _ = load_data()
+dash.register_page(__name__, path='/dashboard', name="Dasbor Eksplorasi", title="Blue Pacific - Dasbor Eksplorasi")
 
-# Ambil daftar unik untuk filter dari data yang bersih
-# Kita menggunakan kode indikator, bukan nama panjang
-indicators = sorted(df['Indicator'].unique())
-# Kita menggunakan kode negara 2 huruf
-countries = sorted(df['Country'].unique())
+# Dataset kecil dikirim sekali ke browser dan difilter di sana (lihat clientside.py).
+# Mode dipilih sekali saat impor karena callback tidak bisa didaftarkan ulang; data
+# sendiri baru dimuat saat layout atau callback pertama membutuhkannya.
+CLIENTSIDE = clientside.startup_enabled()
 
-layout = dbc.Container([
-    dbc.Row(dbc.Col(html.H1("Dasbor Eksplorasi Data", className="text-center my-4"))),
+def layout(**kwargs):
+    # Dibangun per kunjungan halaman dari store yang aktif, jadi data hasil reload
+    # (data_store.reload) langsung terlihat tanpa restart
+    store = data_store.current()
+    df = store.df
 
-    # Filter
-    dbc.Row(dbc.Col(dbc.Card([dbc.CardBody([
+    # Ambil daftar unik untuk filter dari data yang bersih
+    # Kita menggunakan kode indikator, bukan nama panjang
+    indicators = sorted(df['Indicator'].unique())
+    # Kita menggunakan kode negara 2 huruf
+    countries = sorted(df['Country'].unique())
+    min_year, max_year = store.year_bounds
+    # Diisi di sini, bukan oleh callback saat muat awal (lihat update_breakdown_options)
+    breakdown_options, breakdown = store.cube.breakdown_choice(indicators[0], labels=store.labels)
+
+    return dbc.Container([
+        dbc.Row(dbc.Col(html.H1("Dasbor Eksplorasi Data", className="text-center my-4"))),
+
+        # Filter
+        dbc.Row(dbc.Col(dbc.Card([dbc.CardBody([
+            dbc.Row([
+                dbc.Col([
+                    html.Label("Pilih Indikator:", className="fw-bold"),
+                    dcc.Dropdown(id='indicator-dropdown', options=indicators, value=indicators[0])
+                ], md=4),
+                dbc.Col([
+                    html.Label("Pilih Rincian:", className="fw-bold"),
+                    dcc.Dropdown(id='breakdown-dropdown', options=breakdown_options, value=breakdown,
+                                 clearable=False)
+                ], md=4),
+                dbc.Col([
+                    html.Label("Pilih Negara:", className="fw-bold"),
+                    dcc.Dropdown(id='country-dropdown', options=countries, value=countries[:5], multi=True)
+                ], md=4)
+            ]),
+            dbc.Row(dbc.Col([
+                html.Label("Pilih Rentang Tahun:", className="fw-bold mt-3"),
+                dcc.RangeSlider(id='year-range-slider', min=min_year, max=max_year, step=1,
+                                marks={year: str(year) for year in range(min_year, max_year + 1, 2)},
+                                value=[min_year + 5, max_year])
+            ]), className="mt-3")
+        ])]), className="mb-4")),
+
+        # Grafik
         dbc.Row([
-            dbc.Col([
-                html.Label("Pilih Indikator:", className="fw-bold"),
-                dcc.Dropdown(id='indicator-dropdown', options=indicators, value=indicators[0])
-            ], md=6),
-            dbc.Col([
-                html.Label("Pilih Negara:", className="fw-bold"),
-                dcc.Dropdown(id='country-dropdown', options=countries, value=countries[:5], multi=True)
-            ], md=6)
+            dbc.Col(dcc.Graph(id='dashboard-line-chart'), md=12),
         ]),
-        dbc.Row(dbc.Col([
-            html.Label("Pilih Rentang Tahun:", className="fw-bold mt-3"),
-            dcc.RangeSlider(id='year-range-slider', min=df['Year'].min(), max=df['Year'].max(), step=1,
-                            marks={year: str(year) for year in range(df['Year'].min(), df['Year'].max() + 1, 2)},
-                            value=[df['Year'].min() + 5, df['Year'].max()])
-        ]), className="mt-3")
-    ])]), className="mb-4")),
-
-    # Grafik
-    dbc.Row([
-        dbc.Col(dcc.Graph(id='dashboard-line-chart'), md=12),
-    ]),
-    dbc.Row([
-        dbc.Col(dcc.Graph(id='dashboard-bar-chart'), md=12)
-    ])
-], fluid=True)
+        dbc.Row([
+            dbc.Col(dcc.Graph(id='dashboard-bar-chart'), md=12)
+        ]),
+        dcc.Store(id='dashboard-data', data=client_payload(store) if CLIENTSIDE else None),
+    ], fluid=True)
+
+def client_payload(store):
+    # Payload dcc.Store dibangun sekali per versi data; dikirim selama mode clientside
+    # terdaftar, walaupun data hasil reload sudah melewati batasnya
+    clientside.warn_outgrown(store)
+    shells = {'line': figures.line_shell(''), 'bar': figures.bar_shell('v')}
+    return figure_cache.get_cache().get_or_build(f"{store.version}|dashboard-data",
+                                                 lambda: clientside.payload(store, shells))
 
 @callback(
-    Output('dashboard-line-chart', 'figure'),
-    Output('dashboard-bar-chart', 'figure'),
+    Output('breakdown-dropdown', 'options'),
+    Output('breakdown-dropdown', 'value'),
     Input('indicator-dropdown', 'value'),
-    Input('country-dropdown', 'value'),
-    Input('year-range-slider', 'value')
+    State('breakdown-dropdown', 'value'),
+    # Tanpa ini renderer hanya mengirim panggilan grafik yang dipicu breakdown saat muat
+    # awal, dan patch_only() menjawabnya dengan Patch pada grafik yang belum punya shell
+    prevent_initial_call=True,
 )
-def update_dashboard_charts(indicator, countries, year_range):
-    if not indicator or not countries or not year_range:
-        no_data_fig = go.Figure().add_annotation(text="Please select all filters", showarrow=False)
+def update_breakdown_options(indicator, current):
+    # Rincian (jenis kelamin, umur, wilayah, ...) yang ada untuk indikator terpilih
+    store = data_store.current()
+    return store.cube.breakdown_choice(indicator, current, store.labels)
+
+def update_dashboard_charts(indicator, countries, year_range, breakdown=None):
+    # Tanpa indikator belum ada shell figure; negara kosong ditangani di bawah agar
+    # figure tetap punya shell dan bisa di-Patch pada interaksi berikutnya
+    if not indicator or not year_range:
+        no_data_fig = figures.figure({'layout': {}}, [], "Please select all filters")
         return no_data_fig, no_data_fig
 
-    filtered_df = df[
-        (df['Indicator'] == indicator) &
-        (df['Country'].isin(countries)) &
-        (df['Year'].between(year_range[0], year_range[1]))
-    ]
+    # Satu store untuk seluruh request, walaupun reload terjadi di tengah jalan
+    store = data_store.current()
+    cache = figure_cache.get_cache()
+    breakdown = store.cube.resolve_breakdown(indicator, breakdown)
+    key = figure_cache.make_key('dashboard', store, indicator, countries, year_range, breakdown)
+    sel = cache.get_or_build(key, lambda: build_dashboard_selection(store, indicator, countries, year_range, breakdown))
 
-    if filtered_df.empty:
-        no_data_fig = go.Figure().add_annotation(text="No data available for this selection", showarrow=False)
-        return no_data_fig, no_data_fig
+    # Indikator sama, hanya negara/tahun/rincian yang berubah: kirim trace dan judul saja
+    if patch_only(('country-dropdown', 'year-range-slider', 'breakdown-dropdown')):
+        line_fig, bar_fig = Patch(), Patch()
+        line_fig['data'] = sel['line']
+        line_fig['layout']['annotations'] = figures.annotations(sel['message'])
+        bar_fig['data'] = sel['bar']
+        bar_fig['layout']['title']['text'] = sel['bar_title']
+        bar_fig['layout']['annotations'] = figures.annotations(sel['message'])
+        return line_fig, bar_fig
+
+    shells = cache.get_or_build(f"{store.version}|dashboard-shell|{indicator}", lambda: {
+        'line': figures.line_shell(f"Tren Tahunan: {indicator}"),
+        'bar': figures.bar_shell('v'),
+    })
+    return (
+        figures.figure(shells['line'], sel['line'], sel['message']),
+        figures.figure(shells['bar'], sel['bar'], sel['message'], title={'text': sel['bar_title']}),
+    )
+
+def build_dashboard_selection(store, indicator, countries, year_range, breakdown):
+    empty = {'line': [], 'bar': [], 'bar_title': f"Perbandingan di Tahun Terakhir: {indicator}"}
+    if not countries:
+        return {**empty, 'message': "Please select all filters"}
+
+    # Bar Chart (Perbandingan di tahun terakhir yang tersedia), dari tabel agregat
+    with instrumentation.stage('aggregate'):
+        latest = store.cube.summarize(store.index, indicator, countries, year_range, breakdown)
+
+    if not latest:
+        return {**empty, 'message': "No data available for this selection"}
+
+    with instrumentation.stage('filter'):
+        filtered_df = store.index.slice(indicator, countries, year_range, breakdown)
+    colors = figures.country_colors([s.country for s in latest])
 
-    # Line Chart
-    line_fig = px.line(filtered_df, x='Year', y='Value', color='Country', markers=True,
-                       title=f"Tren Tahunan: {indicator}")
+    with instrumentation.stage('figure'):
+        return {
+            'line': figures.line_traces(filtered_df, colors),
+            'bar': figures.bar_traces(latest, colors, 'v'),
+            'bar_title': f"Perbandingan di Tahun Terakhir ({max(s.latest_year for s in latest)}): {indicator}",
+            'message': None,
+        }
 
-    # Bar Chart (Perbandingan di tahun terakhir yang tersedia)
-    latest_df = filtered_df.loc[filtered_df.groupby('Country')['Year'].idxmax()]
-    bar_fig = px.bar(latest_df, x='Country', y='Value', color='Country',
-                     title=f"Perbandingan di Tahun Terakhir ({latest_df['Year'].max()}): {indicator}")
+chart_outputs = [Output('dashboard-line-chart', 'figure'), Output('dashboard-bar-chart', 'figure')]
+filter_inputs = [Input('indicator-dropdown', 'value'), Input('country-dropdown', 'value'),
+                 Input('year-range-slider', 'value'), Input('breakdown-dropdown', 'value')]
 
-    return line_fig, bar_fig
\ No newline at end of file
+if CLIENTSIDE:
+    clientside_callback(
+        ClientsideFunction(clientside.NAMESPACE, 'dashboard_charts'),
+        *chart_outputs, *filter_inputs, Input('dashboard-data', 'data')
+    )
+else:
+    callback(*chart_outputs, *filter_inputs)(update_dashboard_charts)
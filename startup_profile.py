@@ -0,0 +1,105 @@
+# startup_profile.py
+#
+# Mode profil startup: menjalankan impor aplikasi di interpreter baru dengan
+# `python -X importtime`, lalu melaporkan
+#   - total waktu impor `app` (yang dibayar setiap worker tanpa preload_app),
+#   - waktu impor per paket pihak ketiga (self time, dijumlah per paket teratas),
+#   - waktu impor kumulatif per modul aplikasi ini,
+#   - waktu pemuatan data dan render layout pertama per halaman, yang sekarang
+#     terjadi saat request pertama, bukan saat impor.
+#
+#   python startup_profile.py              # profil `app`
+#   python startup_profile.py --top 25
+#   python startup_profile.py --module pages.dashboard
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Dijalankan di subprocess; baris terakhir stdout berisi hasil JSON
+_CHILD = """
+import json, time
+start = time.perf_counter()
+import {module}
+result = {{'import_seconds': time.perf_counter() - start}}
+import dash, data_store
+start = time.perf_counter()
+data_store.current()
+result['data_seconds'] = time.perf_counter() - start
+result['layouts'] = {{}}
+app = dash.get_app() if {is_app} else None
+if app is not None:
+    for name, page in dash.page_registry.items():
+        start = time.perf_counter()
+        with app.server.test_request_context():
+            page['layout']() if callable(page['layout']) else page['layout']
+        result['layouts'][name] = time.perf_counter() - start
+print(json.dumps(result))
+"""
+
+
+def app_modules():
+    """Nama modul milik aplikasi ini (file .py di BASE_DIR dan pages/)."""
+    names = {name[:-3] for name in os.listdir(BASE_DIR) if name.endswith(".py")}
+    pages = os.path.join(BASE_DIR, "pages")
+    if os.path.isdir(pages):
+        names |= {f"pages.{name[:-3]}" for name in os.listdir(pages) if name.endswith(".py")}
+    return names
+
+
+def parse_importtime(lines):
+    """[(modul, self detik, kumulatif detik)] dari keluaran `-X importtime`."""
+    rows = []
+    for line in lines:
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return rows
+
+
+def profile(module="app"):
+    code = _CHILD.format(module=module, is_app=module == "app")
+    env = {**os.environ, "RELOAD_INTERVAL": "0"}
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=BASE_DIR, env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["imports"] = parse_importtime(proc.stderr.splitlines())
+    return result
+
+
+def report(result, top=15):
+    ours = app_modules()
+    packages, modules = {}, []
+    for name, self_s, cumulative in result["imports"]:
+        if name in ours:
+            modules.append((name, cumulative))
+        else:
+            root = name.split(".")[0]
+            packages[root] = packages.get(root, 0.0) + self_s
+
+    lines = [f"Impor: {result['import_seconds']:.3f}s"]
+    lines.append("Paket pihak ketiga (self time):")
+    for name, seconds in sorted(packages.items(), key=lambda kv: -kv[1])[:top]:
+        lines.append(f"  {name:<32} {seconds * 1000:8.1f} ms")
+    lines.append("Modul aplikasi (kumulatif, termasuk impor di dalamnya):")
+    for name, seconds in sorted(modules, key=lambda kv: -kv[1])[:top]:
+        lines.append(f"  {name:<32} {seconds * 1000:8.1f} ms")
+    lines.append(f"Data (request pertama): {result['data_seconds']:.3f}s")
+    for name, seconds in result["layouts"].items():
+        lines.append(f"Layout pertama {name}: {seconds * 1000:.1f} ms")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Profil waktu startup aplikasi Blue Pacific.")
+    parser.add_argument("--module", default="app", help="modul yang diimpor (default: app)")
+    parser.add_argument("--top", type=int, default=15, help="jumlah baris per tabel")
+    args = parser.parse_args()
+    print(report(profile(args.module), args.top))
@@ -0,0 +1,76 @@
+# Memutar ulang urutan request dash-renderer saat halaman dasbor pertama dibuka
+# (mode server): layout halaman, lalu panggilan awal callback grafik tanpa pemicu.
+
+import os
+import sys
+
+os.environ["DASHBOARD_MODE"] = "server"
+os.environ["RELOAD_INTERVAL"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def client():
+    import app
+    return app.server.test_client()
+
+
+def _find(component, component_id):
+    if isinstance(component, dict):
+        if component.get("props", {}).get("id") == component_id:
+            return component["props"]
+        children = component.get("props", {}).get("children")
+        return _find(children, component_id)
+    if isinstance(component, list):
+        for child in component:
+            found = _find(child, component_id)
+            if found is not None:
+                return found
+    return None
+
+
+def _dependencies(client):
+    return client.get("/_dash-dependencies").get_json()
+
+
+def _page(client, deps, path):
+    page = next(d for d in deps if "_pages_content" in d["output"])
+    body = {
+        "output": page["output"],
+        "outputs": [{"id": "_pages_content", "property": "children"}, {"id": "_pages_store", "property": "data"}],
+        "inputs": [{"id": "_pages_location", "property": "pathname", "value": path},
+                   {"id": "_pages_location", "property": "search", "value": ""}],
+        "changedPropIds": ["_pages_location.pathname"], "state": [],
+    }
+    return client.post("/_dash-update-component", json=body).get_json()["response"]["_pages_content"]["children"]
+
+
+def test_breakdown_callback_skips_initial_call(client):
+    deps = _dependencies(client)
+    breakdown = next(d for d in deps if d["output"].startswith("..breakdown-dropdown.options"))
+    # Jika panggilan awal ini berjalan, renderer membuang panggilan awal grafik
+    assert breakdown["prevent_initial_call"] is True
+
+
+def test_dashboard_initial_load_sends_full_figure(client):
+    deps = _dependencies(client)
+    layout = _page(client, deps, "/dashboard")
+    assert _find(layout, "breakdown-dropdown")["value"] is not None
+
+    charts = next(d for d in deps if d["output"] == "..dashboard-line-chart.figure...dashboard-bar-chart.figure..")
+    inputs = [{"id": i["id"], "property": i["property"], "value": _find(layout, i["id"])[i["property"]]}
+              for i in charts["inputs"]]
+    body = {
+        "output": charts["output"],
+        "outputs": [{"id": "dashboard-line-chart", "property": "figure"},
+                    {"id": "dashboard-bar-chart", "property": "figure"}],
+        "inputs": inputs, "changedPropIds": [], "state": [],
+    }
+    response = client.post("/_dash-update-component", json=body).get_json()["response"]
+    for graph in ("dashboard-line-chart", "dashboard-bar-chart"):
+        figure = response[graph]["figure"]
+        assert "__dash_patch_update" not in figure
+        assert figure["layout"]["template"] and figure["data"]
+    assert response["dashboard-line-chart"]["figure"]["layout"]["title"]["text"].startswith("Tren Tahunan")